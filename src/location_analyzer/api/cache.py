@@ -0,0 +1,66 @@
+"""
+In-process TTL cache for /predict responses.
+
+A /predict call costs seconds of live scraping plus a 4-model ensemble
+inference; repeat postcodes are served from memory instead. Concurrent
+requests for the same key share one asyncio lock, so only the first does
+the work and the rest pick up its cached result.
+
+The cache is per-process — each uvicorn worker keeps its own.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache:
+    """Bounded LRU cache with per-entry expiry and per-key request coalescing."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: int = 6 * 3600):
+        """
+        Args:
+            maxsize: Maximum number of entries; least recently used are evicted first.
+            ttl_seconds: Time-to-live for each entry. Default 6 hours.
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Locks vanish once no request holds or waits on them
+        self._locks: weakref.WeakValueDictionary[Hashable, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def lock_for(self, key: Hashable) -> asyncio.Lock:
+        """Get the lock that serializes work for a single key."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -3,8 +3,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from location_analyzer.api.cache import ResponseCache
 from location_analyzer.api.routes import router
 from location_analyzer.ml.predict import PredictionService
+from location_analyzer.pipeline.inference_pipeline import InferencePipeline
 from location_analyzer.config import settings
 
 logger = logging.getLogger(__name__)
@@ -28,9 +30,25 @@ async def lifespan(app: FastAPI):
         # We don't raise here so the app can still boot and serve healthchecks,
         # but the /predict endpoint will 500.
         app.state.model_service = None
+
+    # Build the scraping pipeline once and share it across requests instead of
+    # constructing fresh scrapers (UA pools, cache managers) on every /predict
+    try:
+        app.state.inference_pipeline = InferencePipeline()
+    except Exception as e:
+        logger.error(f"Failed to initialize InferencePipeline: {e}")
+        app.state.inference_pipeline = None
+
+    app.state.predict_cache = ResponseCache(
+        maxsize=settings.api.predict_cache_size,
+        ttl_seconds=settings.api.predict_cache_ttl,
+    )
         
     yield
-    # Shutdown logic (if any) goes here
+
+    # Shutdown: release scraper sessions/browsers
+    if app.state.inference_pipeline is not None:
+        app.state.inference_pipeline.close()
 
 app = FastAPI(
     title="Location Analyzer API",
@@ -1,9 +1,9 @@
 import asyncio
 import logging
 from datetime import datetime
+import pandas as pd
 from fastapi import APIRouter, HTTPException, Request
 from location_analyzer.api.schemas import PredictRequest, PredictResponse, TimeSeriesPrediction
-from location_analyzer.pipeline.inference_pipeline import InferencePipeline
 
 logger = logging.getLogger(__name__)
 
@@ -18,15 +18,52 @@ async def predict_sales(request_body: PredictRequest, request: Request):
     model_service = request.app.state.model_service
     if not model_service:
         raise HTTPException(status_code=500, detail="PredictionService is offline. ML artifacts could not be loaded on startup.")
+
+    pipeline = request.app.state.inference_pipeline
+    if not pipeline:
+        raise HTTPException(
+            status_code=500,
+            detail="InferencePipeline is offline. Scrapers could not be initialized on startup.",
+        )
         
     postcode = request_body.postcode.upper().strip()
     logger.info(f"Received Prediction Request for: {postcode}") 
-    
+
+    # Hot postcodes are served from the in-process cache. The month is part of the
+    # key because the time series starts at the current month. Concurrent requests
+    # for the same key queue on one lock so only the first scrapes and infers.
+    predict_cache = request.app.state.predict_cache
+    cache_key = (postcode, request_body.branch_name, datetime.now().strftime("%Y-%m"))
+
+    async with predict_cache.lock_for(cache_key):
+        cached = predict_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving cached prediction for: {postcode}")
+            return cached
+
+        response, complete = await _run_prediction(postcode, request_body, pipeline, model_service)
+        # A forecast built on a failed scrape is still returned, but not cached,
+        # so the next request retries the scrapers
+        if complete:
+            predict_cache.set(cache_key, response)
+        else:
+            logger.warning(f"Not caching partial-feature prediction for: {postcode}")
+        return response
+
+
+async def _run_prediction(
+    postcode: str, request_body: PredictRequest, pipeline, model_service
+) -> tuple[PredictResponse, bool]:
+    """
+    Scrape features for a postcode and run the 12-month ensemble forecast.
+
+    Returns:
+        (response, complete) — complete is False if any scraper failed.
+    """
     try:
         # Step 1: Run the scraping pipeline in a thread pool to avoid
         # blocking uvicorn's async event loop (Playwright uses sync API)
-        pipeline = InferencePipeline()
-        features = await asyncio.to_thread(pipeline.run, postcode)
+        features, complete = await asyncio.to_thread(pipeline.run_with_status, postcode)
         
         if not features:
             raise HTTPException(status_code=404, detail=f"Could not extract any data for postcode: {postcode}")
@@ -39,24 +76,20 @@ async def predict_sales(request_body: PredictRequest, request: Request):
         # We artificially generate 12 distinct dates for this exact location over the next year
         # to force the XGBoost model to account for Month/Seasonality variances.
         current_date = datetime.now()
-        features_list = []
-        dates_list = []
-        
-        for i in range(12):
-            m = current_date.month + i
-            y = current_date.year + (m - 1) // 12
-            m = (m - 1) % 12 + 1
-            
-            # Predict for the 1st day of that future month
-            pred_date = datetime(y, m, 1)
-            f_copy = features.copy()
-            f_copy['Date'] = pred_date.strftime("%Y-%m-%d")
-            
-            features_list.append(f_copy)
-            dates_list.append(pred_date.strftime("%b %Y"))
+        # Predict for the 1st day of each of the next 12 months
+        pred_dates = pd.date_range(
+            pd.Timestamp(current_date.year, current_date.month, 1), periods=12, freq='MS'
+        )
+        dates_list = pred_dates.strftime("%b %Y").tolist()
+
+        # Build the batch of 12 records as one DataFrame: the scraped features are
+        # broadcast across every row and only the Date column varies
+        batch_df = pd.DataFrame([features] * len(pred_dates))
+        batch_df['Date'] = pred_dates.strftime("%Y-%m-%d").tolist()
 
-        # Feed the batch of 12 records into the ML Model Feature Engineering pipeline simultaneously
-        predictions = model_service.predict(features_list)
+        # Feed the batch into the ML Model Feature Engineering pipeline simultaneously.
+        # Inference is CPU-bound native code, so keep it off the event loop as well.
+        predictions = await asyncio.to_thread(model_service.predict_df, batch_df)
         
         # Format the time series graph
         time_series = [
@@ -64,12 +97,13 @@ async def predict_sales(request_body: PredictRequest, request: Request):
             for d, p in zip(dates_list, predictions)
         ]
         
-        return PredictResponse(
+        response = PredictResponse(
             postcode=postcode,
             predicted_sales=time_series[0].predicted_sales,
             features=features,
             time_series=time_series
         )
+        return response, complete
         
     except Exception as e:
         logger.error(f"Inference pipeline failed: {e}", exc_info=True)
@@ -5,6 +5,7 @@ All settings are loaded from environment variables or .env file.
 No hardcoded secrets or paths — everything is configurable.
 """
 
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -17,7 +18,7 @@ class DatabaseSettings(BaseSettings):
     
     url: str = "sqlite:///./data/location_analyzer.db"
 
-    model_config = SettingsConfigDict(env_prefix="DATABASE_")
+    model_config = SettingsConfigDict(env_prefix="DATABASE_", defer_build=True)
 
 
 class APISettings(BaseSettings):
@@ -27,8 +28,10 @@ class APISettings(BaseSettings):
     port: int = 8000
     reload: bool = True
     cors_origins: list[str] = ["*"]
+    predict_cache_size: int = 1024
+    predict_cache_ttl: int = 6 * 3600  # seconds
 
-    model_config = SettingsConfigDict(env_prefix="API_")
+    model_config = SettingsConfigDict(env_prefix="API_", defer_build=True)
 
 
 class ScraperSettings(BaseSettings):
@@ -42,7 +45,7 @@ class ScraperSettings(BaseSettings):
     headless: bool = True
     nomis_api_uid: Optional[str] = None
 
-    model_config = SettingsConfigDict(env_prefix="SCRAPER_")
+    model_config = SettingsConfigDict(env_prefix="SCRAPER_", defer_build=True)
 
     @field_validator("proxies", mode="before")
     @classmethod
@@ -60,7 +63,7 @@ class MLSettings(BaseSettings):
     models_dir: str = "models"
     default_metric: str = "rmse"
 
-    model_config = SettingsConfigDict(env_prefix="ML_")
+    model_config = SettingsConfigDict(env_prefix="ML_", defer_build=True)
 
 
 class PathSettings(BaseSettings):
@@ -72,7 +75,7 @@ class PathSettings(BaseSettings):
     cache_dir: str = "data/cache"
     plots_dir: str = "data/plots"
 
-    model_config = SettingsConfigDict(env_prefix="")
+    model_config = SettingsConfigDict(env_prefix="", defer_build=True)
 
     def ensure_dirs(self) -> None:
         """Create all configured directories if they don't exist."""
@@ -87,7 +90,7 @@ class NgrokSettings(BaseSettings):
     auth_token: Optional[str] = None
     domain: Optional[str] = None
 
-    model_config = SettingsConfigDict(env_prefix="NGROK_")
+    model_config = SettingsConfigDict(env_prefix="NGROK_", defer_build=True)
 
 
 class LoggingSettings(BaseSettings):
@@ -96,19 +99,43 @@ class LoggingSettings(BaseSettings):
     level: str = "INFO"
     file: str = "logs/location_analyzer.log"
 
-    model_config = SettingsConfigDict(env_prefix="LOG_")
+    model_config = SettingsConfigDict(env_prefix="LOG_", defer_build=True)
 
 
 class Settings(BaseSettings):
-    """Main application settings — aggregates all sub-settings."""
+    """Main application settings — aggregates all sub-settings.
 
-    database: DatabaseSettings = DatabaseSettings()
-    api: APISettings = APISettings()
-    scraper: ScraperSettings = ScraperSettings()
-    ml: MLSettings = MLSettings()
-    paths: PathSettings = PathSettings()
-    ngrok: NgrokSettings = NgrokSettings()
-    logging: LoggingSettings = LoggingSettings()
+    Sub-settings are built on first access rather than at import, so a process
+    only pays the env parsing and validation for the sections it actually uses.
+    """
+
+    @cached_property
+    def database(self) -> DatabaseSettings:
+        return DatabaseSettings()
+
+    @cached_property
+    def api(self) -> APISettings:
+        return APISettings()
+
+    @cached_property
+    def scraper(self) -> ScraperSettings:
+        return ScraperSettings()
+
+    @cached_property
+    def ml(self) -> MLSettings:
+        return MLSettings()
+
+    @cached_property
+    def paths(self) -> PathSettings:
+        return PathSettings()
+
+    @cached_property
+    def ngrok(self) -> NgrokSettings:
+        return NgrokSettings()
+
+    @cached_property
+    def logging(self) -> LoggingSettings:
+        return LoggingSettings()
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -124,5 +151,23 @@ class Settings(BaseSettings):
         log_dir.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the application Settings once, on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """Stand-in for the global Settings that defers construction to first attribute access."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
 # Global settings instance — import this in other modules
-settings = Settings()
+settings = _LazySettings()
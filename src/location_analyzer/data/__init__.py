@@ -1,13 +1,33 @@
-"""Data layer — database engine, ORM models, caching, and repository."""
+"""Data layer — database engine, ORM models, caching, and repository.
 
-from location_analyzer.data.database import Base, create_db_engine, create_session_factory, init_db
-from location_analyzer.data.models import (
-    Postcode, Demographics, SalesData, GoogleMapsPlace,
-    CrystalEthnicity, CrystalRestaurant, CrystalPub,
-    CrystalIncome, CrystalTransport, CrystalOccupation, University,
-)
-from location_analyzer.data.cache import CacheManager
-from location_analyzer.data.repository import PostcodeRepository
+Exports are resolved lazily (PEP 562) so that importing one submodule —
+e.g. the cache from the scrapers — doesn't pull in SQLAlchemy and the ORM models.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from location_analyzer.data.database import Base, create_db_engine, create_session_factory, init_db
+    from location_analyzer.data.models import (
+        Postcode, Demographics, SalesData, GoogleMapsPlace,
+        CrystalEthnicity, CrystalRestaurant, CrystalPub,
+        CrystalIncome, CrystalTransport, CrystalOccupation, University,
+    )
+    from location_analyzer.data.cache import CacheManager
+    from location_analyzer.data.repository import PostcodeRepository
+
+_EXPORTS = {
+    "Base": "database", "create_db_engine": "database",
+    "create_session_factory": "database", "init_db": "database",
+    "Postcode": "models", "Demographics": "models", "SalesData": "models",
+    "GoogleMapsPlace": "models", "CrystalEthnicity": "models",
+    "CrystalRestaurant": "models", "CrystalPub": "models",
+    "CrystalIncome": "models", "CrystalTransport": "models",
+    "CrystalOccupation": "models", "University": "models",
+    "CacheManager": "cache",
+    "PostcodeRepository": "repository",
+}
 
 __all__ = [
     "Base", "create_db_engine", "create_session_factory", "init_db",
@@ -16,3 +36,16 @@ __all__ = [
     "CrystalIncome", "CrystalTransport", "CrystalOccupation", "University",
     "CacheManager", "PostcodeRepository",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -2,16 +2,19 @@
 Thread-safe JSON file cache for scraped data.
 
 Provides a persistent cache that falls back to cached data when scrapers
-fail. Data is stored as JSON files in the cache directory, organized
-by data type (demographics, crystal, gmaps).
+fail. Data is stored as compact JSON files (encoded with orjson) in the cache
+directory, organized by data type (demographics, crystal, gmaps).
 """
 
-import json
 import hashlib
+import os
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
-from filelock import FileLock
+
+import orjson
 
 from location_analyzer.config import settings
 from location_analyzer.logging_config import get_logger
@@ -35,6 +38,14 @@ class CacheManager:
 
     CATEGORIES = ("demographics", "crystal", "gmaps", "sales")
 
+    # Scraped payloads may carry numpy scalars or non-string keys
+    _DUMP_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    # Cache roots whose category directories are known to exist, shared by all
+    # instances so warm construction skips the mkdir syscalls entirely
+    _dirs_ready: set[Path] = set()
+    _dirs_lock = threading.Lock()
+
     def __init__(self, cache_dir: str | None = None, ttl_seconds: int = 86400 * 30):
         """
         Args:
@@ -43,28 +54,47 @@ class CacheManager:
         """
         self.cache_dir = Path(cache_dir or settings.paths.cache_dir)
         self.ttl_seconds = ttl_seconds
+        # Category directories are fixed, so build their Paths once
+        self._cat_dirs = {cat: self.cache_dir / cat for cat in self.CATEGORIES}
         self._ensure_dirs()
 
     def _ensure_dirs(self) -> None:
-        """Create cache subdirectories."""
-        for category in self.CATEGORIES:
-            (self.cache_dir / category).mkdir(parents=True, exist_ok=True)
+        """Create cache subdirectories (once per cache root per process)."""
+        root = self.cache_dir.absolute()
+        if root in CacheManager._dirs_ready:
+            return
+        with CacheManager._dirs_lock:
+            if root in CacheManager._dirs_ready:
+                return
+            try:
+                with os.scandir(root) as entries:
+                    existing = {e.name for e in entries if e.is_dir()}
+            except FileNotFoundError:
+                existing = set()
+            for category in self.CATEGORIES:
+                if category not in existing:
+                    self._cat_dirs[category].mkdir(parents=True, exist_ok=True)
+            CacheManager._dirs_ready.add(root)
 
     @staticmethod
+    @lru_cache(maxsize=8192)
     def _safe_key(key: str) -> str:
         """
         Generate a filesystem-safe filename from the key using MD5.
         This handles special characters (like '|', '=', '/') safely.
+
+        Only the postcode (the part before any '|kwarg=value' suffix) is
+        normalized, trimmed and upper-cased, so 'sw1a 1aa' and 'SW1A 1AA' share
+        an entry while the rest of the key hashes exactly as before. Memoized,
+        as the same postcodes recur across a scrape run.
         """
-        return hashlib.md5(key.encode("utf-8")).hexdigest()
+        postcode, sep, rest = key.partition("|")
+        return hashlib.md5(f"{postcode.strip().upper()}{sep}{rest}".encode("utf-8")).hexdigest()
 
     def _path_for(self, category: str, key: str) -> Path:
         """Get the file path for a cache entry."""
-        return self.cache_dir / category / f"{self._safe_key(key)}.json"
-
-    def _lock_for(self, path: Path) -> FileLock:
-        """Get a file lock for thread-safe access."""
-        return FileLock(str(path) + ".lock", timeout=5)
+        cat_dir = self._cat_dirs.get(category) or self.cache_dir / category
+        return cat_dir / f"{self._safe_key(key)}.json"
 
     def get(self, category: str, postcode: str) -> Optional[dict[str, Any]]:
         """
@@ -78,23 +108,27 @@ class CacheManager:
             Cached data dict, or None if not found or expired.
         """
         path = self._path_for(category, postcode)
-        if not path.exists():
-            return None
-
-        lock = self._lock_for(path)
+        # No lock needed: writers publish complete files via atomic rename
         try:
-            with lock:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                # Check TTL
-                cached_at = data.get("_cached_at", 0)
-                if time.time() - cached_at > self.ttl_seconds:
-                    logger.debug("Cache expired for %s/%s", category, postcode)
-                    return None
-                return data.get("payload")
-        except (json.JSONDecodeError, OSError) as e:
+            data = orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except orjson.JSONDecodeError as e:
+            # Drop the corrupt entry so has() stops reporting it as valid
+            logger.warning("Corrupt cache entry for %s/%s, removing: %s", category, postcode, e)
+            path.unlink(missing_ok=True)
+            return None
+        except OSError as e:
             logger.warning("Cache read error for %s/%s: %s", category, postcode, e)
             return None
 
+        # Check TTL
+        cached_at = data.get("_cached_at", 0)
+        if time.time() - cached_at > self.ttl_seconds:
+            logger.debug("Cache expired for %s/%s", category, postcode)
+            return None
+        return data.get("payload")
+
     def set(self, category: str, postcode: str, data: dict[str, Any]) -> None:
         """
         Store data in cache.
@@ -105,7 +139,6 @@ class CacheManager:
             data: The data dict to cache.
         """
         path = self._path_for(category, postcode)
-        lock = self._lock_for(path)
 
         envelope = {
             "_cached_at": time.time(),
@@ -113,19 +146,37 @@ class CacheManager:
             "payload": data,
         }
 
+        # Write to a writer-unique temp file, then atomically swap it in so
+        # readers never see a partial file (last writer wins)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
         try:
-            with lock:
-                path.write_text(
-                    json.dumps(envelope, indent=2, default=str),
-                    encoding="utf-8",
-                )
+            payload = orjson.dumps(envelope, default=str, option=self._DUMP_OPTIONS)
+            try:
+                tmp_path.write_bytes(payload)
+            except FileNotFoundError:
+                # Directory setup is skipped once a root is prepared, so recreate
+                # a category directory that was deleted since, then retry once
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
             logger.debug("Cached %s data for %s", category, postcode)
         except OSError as e:
             logger.error("Cache write error for %s/%s: %s", category, postcode, e)
+            tmp_path.unlink(missing_ok=True)
 
     def has(self, category: str, postcode: str) -> bool:
-        """Check if valid (non-expired) cache exists."""
-        return self.get(category, postcode) is not None
+        """
+        Check if valid (non-expired) cache exists.
+
+        Uses the file's mtime rather than parsing the envelope: set() publishes
+        each entry with a fresh rename, so mtime tracks '_cached_at', and get()
+        removes entries it can't decode.
+        """
+        try:
+            mtime = os.stat(self._path_for(category, postcode)).st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - mtime <= self.ttl_seconds
 
     def invalidate(self, category: str, postcode: str) -> bool:
         """
@@ -151,21 +202,27 @@ class CacheManager:
         count = 0
         categories = [category] if category else self.CATEGORIES
         for cat in categories:
-            cat_dir = self.cache_dir / cat
-            if cat_dir.exists():
-                for f in cat_dir.glob("*.json"):
-                    f.unlink()
-                    count += 1
-                # Clean up lock files too
-                for f in cat_dir.glob("*.lock"):
-                    f.unlink()
+            try:
+                with os.scandir(self._cat_dirs.get(cat) or self.cache_dir / cat) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json"):
+                            os.unlink(entry.path)
+                            count += 1
+                        # Clean up lock files left by older cache versions
+                        elif entry.name.endswith(".lock"):
+                            os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
         logger.info("Cleared %d cache entries", count)
         return count
 
     def stats(self) -> dict[str, int]:
         """Return cache statistics: entry count per category."""
-        return {
-            cat: len(list((self.cache_dir / cat).glob("*.json")))
-            for cat in self.CATEGORIES
-            if (self.cache_dir / cat).exists()
-        }
+        counts = {}
+        for cat in self.CATEGORIES:
+            try:
+                with os.scandir(self._cat_dirs[cat]) as entries:
+                    counts[cat] = sum(1 for e in entries if e.name.endswith(".json"))
+            except FileNotFoundError:
+                continue
+        return counts
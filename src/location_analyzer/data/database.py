@@ -2,7 +2,7 @@
 Database engine and session management.
 
 Supports PostgreSQL (production) and SQLite (development) via DATABASE_URL.
-Uses SQLAlchemy with connection pooling and health checks.
+Uses SQLAlchemy with connection pooling and periodic connection recycling.
 """
 
 from sqlalchemy import create_engine, event, text
@@ -48,12 +48,18 @@ def create_db_engine(database_url: str | None = None):
                 poolclass=StaticPool,
                 echo=False,
             )
-            # Enable WAL mode and foreign keys for SQLite
+            # Enable WAL mode and foreign keys for SQLite, and tune for bulk loads:
+            # under WAL, synchronous=NORMAL skips the fsync per commit while staying
+            # corruption-safe; 64MB page cache, in-memory temp tables, 256MB mmap reads
             @event.listens_for(engine, "connect")
             def _set_sqlite_pragma(dbapi_conn, connection_record):
                 cursor = dbapi_conn.cursor()
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA foreign_keys=ON")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA cache_size=-65536")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+                cursor.execute("PRAGMA mmap_size=268435456")
                 cursor.close()
         else:
             # PostgreSQL: connection pooling
@@ -61,7 +67,9 @@ def create_db_engine(database_url: str | None = None):
                 url,
                 pool_size=10,
                 max_overflow=20,
-                pool_pre_ping=True,  # Health check before using connection
+                # Recycle sockets older than 30 min instead of a SELECT 1 on every
+                # checkout; connections idle past that are replaced proactively
+                pool_recycle=1800,
                 echo=False,
             )
 
@@ -12,11 +12,16 @@ from sqlalchemy import (
     String, Integer, Float, Text, DateTime, Boolean, JSON,
     ForeignKey, Index, func,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from location_analyzer.data.database import Base
 
 
+# Binary, key-indexable JSONB on PostgreSQL; plain JSON (JSON1 text) elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
 # --- Core Tables ---
 
 
@@ -38,15 +43,34 @@ class Postcode(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
-    # Relationships
-    demographics: Mapped[Optional["Demographics"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_ethnicity: Mapped[Optional["CrystalEthnicity"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_restaurants: Mapped[Optional["CrystalRestaurant"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_pubs: Mapped[Optional["CrystalPub"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_income: Mapped[Optional["CrystalIncome"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_transport: Mapped[Optional["CrystalTransport"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    crystal_occupation: Mapped[Optional["CrystalOccupation"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
-    universities: Mapped[Optional["University"]] = relationship(back_populates="postcode_ref", cascade="all, delete-orphan")
+    # Relationships — implicit lazy loads raise; eager-load with selectinload()
+    demographics: Mapped[Optional["Demographics"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_ethnicity: Mapped[Optional["CrystalEthnicity"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_restaurants: Mapped[Optional["CrystalRestaurant"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_pubs: Mapped[Optional["CrystalPub"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_income: Mapped[Optional["CrystalIncome"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_transport: Mapped[Optional["CrystalTransport"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    crystal_occupation: Mapped[Optional["CrystalOccupation"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    universities: Mapped[Optional["University"]] = relationship(
+        back_populates="postcode_ref", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+    places: Mapped[list["GoogleMapsPlace"]] = relationship(
+        cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
 
     def __repr__(self) -> str:
         return f"<Postcode(postcode='{self.postcode}', prediction={self.prediction})>"
@@ -63,8 +87,7 @@ class Demographics(Base):
     """
     __tablename__ = "postcode_area_demographics"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), unique=True)
+    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
     population: Mapped[Optional[int]] = mapped_column(Integer)
     households: Mapped[Optional[int]] = mapped_column(Integer)
     avg_household_income: Mapped[Optional[float]] = mapped_column(Float)
@@ -92,17 +115,21 @@ class CrystalEthnicity(Base):
     __tablename__ = "crystal_ethnicity"
 
     postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
-    ethnicity: Mapped[Optional[dict]] = mapped_column(JSON)
+    ethnicity: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_ethnicity")
 
+    # GIN index for key lookups/containment queries on PostgreSQL only
+    __table_args__ = (
+        Index("ix_ethnicity_gin", "ethnicity", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 
 class CrystalRestaurant(Base):
     """CrystalRoof nearby restaurants (stored as JSON)."""
     __tablename__ = "crystal_restaurants"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), unique=True)
-    restaurants: Mapped[Optional[dict]] = mapped_column(JSON)
+    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
+    restaurants: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_restaurants")
 
 
@@ -110,9 +137,8 @@ class CrystalPub(Base):
     """CrystalRoof nearby pubs (stored as JSON)."""
     __tablename__ = "crystal_pubs"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), unique=True)
-    pubs: Mapped[Optional[dict]] = mapped_column(JSON)
+    postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
+    pubs: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_pubs")
 
 
@@ -121,7 +147,7 @@ class CrystalIncome(Base):
     __tablename__ = "crystal_income"
 
     postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
-    income: Mapped[Optional[dict]] = mapped_column(JSON)
+    income: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_income")
 
 
@@ -130,7 +156,7 @@ class CrystalTransport(Base):
     __tablename__ = "crystal_transport"
 
     postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
-    transport: Mapped[Optional[dict]] = mapped_column(JSON)
+    transport: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_transport")
 
 
@@ -139,7 +165,7 @@ class CrystalOccupation(Base):
     __tablename__ = "crystal_occupation"
 
     postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
-    occupation: Mapped[Optional[dict]] = mapped_column(JSON)
+    occupation: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="crystal_occupation")
 
 
@@ -151,7 +177,7 @@ class University(Base):
     __tablename__ = "gmaps_universities"
 
     postcode: Mapped[str] = mapped_column(String(10), ForeignKey("postcodes.postcode"), primary_key=True)
-    universities: Mapped[Optional[dict]] = mapped_column(JSON)
+    universities: Mapped[Optional[dict]] = mapped_column(JSONType)
     postcode_ref: Mapped["Postcode"] = relationship(back_populates="universities")
 
 
@@ -196,7 +222,12 @@ class SalesData(Base):
     day_of_week: Mapped[Optional[str]] = mapped_column(String(10))
     total_sale: Mapped[Optional[float]] = mapped_column(Float)
 
-    __table_args__ = (Index("ix_sales_branch_date", "branch_name", "date"),)
+    __table_args__ = (
+        Index("ix_sales_branch_date", "branch_name", "date"),
+        # Covering index for training scans by outercode + date range: total_sale
+        # rides along as a key column so the query never touches the table heap
+        Index("ix_sales_outercode_date_sale", "outercode", "date", "total_sale"),
+    )
 
     def __repr__(self) -> str:
         return f"<SalesData(branch='{self.branch_name}', date={self.date}, sale={self.total_sale})>"
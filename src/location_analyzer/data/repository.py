@@ -5,11 +5,14 @@ Replaces the old connector.py's 17 raw-SQL methods with a single
 PostcodeRepository class using SQLAlchemy ORM.
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Iterator, TYPE_CHECKING
 from datetime import datetime
+from pathlib import Path
 
-from sqlalchemy import select, func, delete
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select, func, delete, event, exists, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from location_analyzer.data.models import (
     Postcode,
@@ -27,9 +30,23 @@ from location_analyzer.data.models import (
 from location_analyzer.logging_config import get_logger
 from location_analyzer.exceptions import PostcodeNotFoundError
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = get_logger(__name__)
 
 
+def _postcode_outercode(postcode: str) -> str:
+    """Outercode for a Postcode row: the part before the space, else the first 3 characters."""
+    postcode = postcode.strip().upper()
+    return postcode.split()[0] if " " in postcode else postcode[:3]
+
+
+def _sales_outercode(postcode: Optional[str]) -> Optional[str]:
+    """Outercode for a sales record: the part before the space, or None if there isn't one."""
+    return postcode.strip().split()[0].upper() if postcode and " " in postcode else None
+
+
 class PostcodeRepository:
     """
     All database operations for postcode data.
@@ -43,6 +60,7 @@ class PostcodeRepository:
 
     def __init__(self, session: Session):
         self.session = session
+        self._known_postcodes = self._session_known_postcodes(session)
 
     # --- Postcode CRUD ---
 
@@ -56,44 +74,103 @@ class PostcodeRepository:
         max_prediction: float | None = None,
     ) -> Postcode:
         """Insert or update a postcode record."""
-        # Extract outercode (first part before space)
-        outercode = postcode.strip().split()[0] if " " in postcode else postcode[:3]
-
-        existing = self.session.get(Postcode, postcode)
-        if existing:
-            if radius is not None:
-                existing.radius = radius
-            if address is not None:
-                existing.address = address
-            if prediction is not None:
-                existing.prediction = prediction
-            if min_prediction is not None:
-                existing.min_prediction = min_prediction
-            if max_prediction is not None:
-                existing.max_prediction = max_prediction
-            self.session.flush()
-            return existing
-
-        pc = Postcode(
-            postcode=postcode,
-            outercode=outercode,
-            radius=radius,
-            address=address,
-            prediction=prediction,
-            min_prediction=min_prediction,
-            max_prediction=max_prediction,
+        outercode = _postcode_outercode(postcode)
+
+        updates = {
+            "radius": radius,
+            "address": address,
+            "prediction": prediction,
+            "min_prediction": min_prediction,
+            "max_prediction": max_prediction,
+        }
+        pc = self._upsert(
+            Postcode,
+            {"postcode": postcode, "outercode": outercode, **updates},
+            update_cols=[k for k, v in updates.items() if v is not None],
         )
-        self.session.add(pc)
-        self.session.flush()
+        self._known_postcodes.add(postcode)
         return pc
 
+    def bulk_upsert_postcodes(self, rows: list[dict[str, Any]], chunk_size: int = 10_000) -> int:
+        """
+        Insert or update many postcode records in batched statements.
+
+        Each chunk is sent as one executemany INSERT ... ON CONFLICT DO UPDATE,
+        which SQLAlchemy packs into multi-row VALUES pages. As with
+        upsert_postcode, a None field never overwrites an existing value.
+        A postcode repeated in ``rows`` is written once, merged in order.
+
+        Args:
+            rows: Dicts with a 'postcode' key and optionally radius, address,
+                  prediction, min_prediction, max_prediction.
+            chunk_size: Rows per executemany call, to cap memory.
+
+        Returns:
+            Number of distinct postcodes written.
+        """
+        if not rows:
+            return 0
+        fields = ("radius", "address", "prediction", "min_prediction", "max_prediction")
+        # One record per postcode: PostgreSQL rejects an ON CONFLICT DO UPDATE that
+        # hits the same row twice within a multi-row VALUES page. Repeats merge,
+        # with later non-None fields winning.
+        merged: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            postcode = row["postcode"]
+            record = merged.get(postcode)
+            if record is None:
+                merged[postcode] = {
+                    "postcode": postcode,
+                    "outercode": _postcode_outercode(postcode),
+                    **{field: row.get(field) for field in fields},
+                }
+            else:
+                record.update((field, row[field]) for field in fields if row.get(field) is not None)
+        records = list(merged.values())
+
+        table = Postcode.__table__
+        stmt = self._dialect_insert()(Postcode)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["postcode"],
+            set_={
+                **{field: func.coalesce(stmt.excluded[field], table.c[field]) for field in fields},
+                "updated_at": func.now(),
+            },
+        )
+        for start in range(0, len(records), chunk_size):
+            self.session.execute(stmt, records[start:start + chunk_size])
+
+        self._known_postcodes.update(r["postcode"] for r in records)
+        logger.info("Bulk upserted %d postcodes", len(records))
+        return len(records)
+
+    @staticmethod
+    def _session_known_postcodes(session: Session) -> set[str]:
+        """
+        Postcodes known to exist in this session, so child upserts can skip
+        writing the parent row.
+
+        Kept in session.info (shared by every repository on the session) and
+        cleared on any rollback, since a rolled-back postcode row is gone again.
+        """
+        known = session.info.get("known_postcodes")
+        if known is None:
+            known = session.info["known_postcodes"] = set()
+            event.listen(session, "after_soft_rollback", lambda sess, previous_transaction: known.clear())
+        return known
+
+    def _ensure_postcode(self, postcode: str) -> None:
+        """Make sure the parent postcode row exists, writing it at most once."""
+        if postcode not in self._known_postcodes:
+            self.upsert_postcode(postcode)
+
     def get_postcode(self, postcode: str) -> Optional[Postcode]:
         """Get a postcode record, or None if not found."""
         return self.session.get(Postcode, postcode)
 
     def postcode_exists(self, postcode: str) -> bool:
-        """Check if a postcode exists in the database."""
-        return self.session.get(Postcode, postcode) is not None
+        """Check if a postcode exists in the database (EXISTS probe, no row load)."""
+        return bool(self.session.scalar(select(exists().where(Postcode.postcode == postcode))))
 
     def list_postcodes(self, limit: int = 100, offset: int = 0) -> list[Postcode]:
         """List all postcodes with pagination."""
@@ -105,6 +182,7 @@ class PostcodeRepository:
         pc = self.session.get(Postcode, postcode)
         if pc:
             self.session.delete(pc)
+            self._known_postcodes.discard(postcode)
             self.session.flush()
             return True
         return False
@@ -122,46 +200,25 @@ class PostcodeRepository:
                       unemployed, ab, c1_c2, de, white, non_white).
         """
         # Ensure the postcode exists first
-        self.upsert_postcode(postcode)
-
-        existing = self.session.execute(
-            select(Demographics).where(Demographics.postcode == postcode)
-        ).scalar_one_or_none()
+        self._ensure_postcode(postcode)
 
-        if existing:
-            for key, value in kwargs.items():
-                if hasattr(existing, key) and value is not None:
-                    setattr(existing, key, value)
-            self.session.flush()
-            return existing
-
-        demo = Demographics(postcode=postcode, **kwargs)
-        self.session.add(demo)
-        self.session.flush()
-        return demo
+        return self._upsert(
+            Demographics,
+            {"postcode": postcode, **kwargs},
+            update_cols=[k for k, v in kwargs.items() if v is not None],
+        )
 
     def get_demographics(self, postcode: str) -> Optional[Demographics]:
         """Get demographics for a postcode."""
-        return self.session.execute(
-            select(Demographics).where(Demographics.postcode == postcode)
-        ).scalar_one_or_none()
+        return self.session.get(Demographics, postcode)
 
     # --- Crystal Data CRUD (generic for all Crystal tables) ---
 
     def _upsert_crystal(self, model_class, postcode: str, field_name: str, data: dict) -> Any:
         """Generic upsert for any CrystalRoof table."""
-        self.upsert_postcode(postcode)
-
-        existing = self.session.get(model_class, postcode)
-        if existing:
-            setattr(existing, field_name, data)
-            self.session.flush()
-            return existing
+        self._ensure_postcode(postcode)
 
-        obj = model_class(postcode=postcode, **{field_name: data})
-        self.session.add(obj)
-        self.session.flush()
-        return obj
+        return self._upsert(model_class, {"postcode": postcode, field_name: data}, update_cols=[field_name])
 
     def _get_crystal(self, model_class, postcode: str) -> Optional[Any]:
         """Generic get for any CrystalRoof table."""
@@ -175,43 +232,16 @@ class PostcodeRepository:
         return self._get_crystal(CrystalEthnicity, postcode)
 
     def upsert_crystal_restaurants(self, postcode: str, data: dict) -> CrystalRestaurant:
-        # CrystalRestaurant uses auto-increment id, not postcode as PK
-        self.upsert_postcode(postcode)
-        existing = self.session.execute(
-            select(CrystalRestaurant).where(CrystalRestaurant.postcode == postcode)
-        ).scalar_one_or_none()
-        if existing:
-            existing.restaurants = data
-            self.session.flush()
-            return existing
-        obj = CrystalRestaurant(postcode=postcode, restaurants=data)
-        self.session.add(obj)
-        self.session.flush()
-        return obj
+        return self._upsert_crystal(CrystalRestaurant, postcode, "restaurants", data)
 
     def get_crystal_restaurants(self, postcode: str) -> Optional[CrystalRestaurant]:
-        return self.session.execute(
-            select(CrystalRestaurant).where(CrystalRestaurant.postcode == postcode)
-        ).scalar_one_or_none()
+        return self._get_crystal(CrystalRestaurant, postcode)
 
     def upsert_crystal_pubs(self, postcode: str, data: dict) -> CrystalPub:
-        self.upsert_postcode(postcode)
-        existing = self.session.execute(
-            select(CrystalPub).where(CrystalPub.postcode == postcode)
-        ).scalar_one_or_none()
-        if existing:
-            existing.pubs = data
-            self.session.flush()
-            return existing
-        obj = CrystalPub(postcode=postcode, pubs=data)
-        self.session.add(obj)
-        self.session.flush()
-        return obj
+        return self._upsert_crystal(CrystalPub, postcode, "pubs", data)
 
     def get_crystal_pubs(self, postcode: str) -> Optional[CrystalPub]:
-        return self.session.execute(
-            select(CrystalPub).where(CrystalPub.postcode == postcode)
-        ).scalar_one_or_none()
+        return self._get_crystal(CrystalPub, postcode)
 
     def upsert_crystal_income(self, postcode: str, data: dict) -> CrystalIncome:
         return self._upsert_crystal(CrystalIncome, postcode, "income", data)
@@ -243,7 +273,7 @@ class PostcodeRepository:
 
     def add_place(self, postcode: str, **kwargs) -> GoogleMapsPlace:
         """Add a Google Maps place record."""
-        self.upsert_postcode(postcode)
+        self._ensure_postcode(postcode)
         place = GoogleMapsPlace(postcode=postcode, **kwargs)
         self.session.add(place)
         self.session.flush()
@@ -267,7 +297,7 @@ class PostcodeRepository:
         day_of_week: str | None = None,
     ) -> SalesData:
         """Add a single sales record."""
-        outercode = postcode.strip().split()[0] if postcode and " " in postcode else None
+        outercode = _sales_outercode(postcode)
 
         record = SalesData(
             branch_name=branch_name,
@@ -283,6 +313,34 @@ class PostcodeRepository:
         self.session.flush()
         return record
 
+    def bulk_add_sales_records(self, rows: list[dict[str, Any]], chunk_size: int = 10_000) -> int:
+        """
+        Insert many sales records in one executemany batch.
+
+        Uses a Core INSERT rather than ORM objects, so rows skip the identity
+        map and per-object events — the path for loading the full sales sheet.
+
+        Args:
+            rows: Dicts with SalesData fields (branch_name, date, total_sale,
+                  and optionally postcode, source, shopname, day_of_week).
+                  outercode is derived from postcode when not given.
+            chunk_size: Rows per executemany call, to cap memory.
+
+        Returns:
+            Number of rows inserted.
+        """
+        if not rows:
+            return 0
+        records = []
+        for row in rows:
+            if "outercode" not in row:
+                row = {**row, "outercode": _sales_outercode(row.get("postcode"))}
+            records.append(row)
+        for start in range(0, len(records), chunk_size):
+            self.session.execute(insert(SalesData), records[start:start + chunk_size])
+        logger.info("Bulk inserted %d sales records", len(records))
+        return len(records)
+
     def get_sales_by_branch(
         self,
         branch_name: str,
@@ -290,17 +348,101 @@ class PostcodeRepository:
         end_date: datetime | None = None,
     ) -> list[SalesData]:
         """Get sales records for a branch, optionally filtered by date range."""
+        return list(self.session.scalars(self._sales_by_branch_stmt(branch_name, start_date, end_date)))
+
+    def iter_sales_by_branch(
+        self,
+        branch_name: str,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[SalesData]:
+        """
+        Stream a branch's sales records in date order, fetching ``batch_size`` at a time.
+
+        Same filters as get_sales_by_branch, but rows are hydrated per batch
+        instead of all up front — for long date ranges.
+        """
+        stmt = self._sales_by_branch_stmt(branch_name, start_date, end_date)
+        yield from self.session.scalars(stmt.execution_options(yield_per=batch_size))
+
+    @staticmethod
+    def _sales_by_branch_stmt(
+        branch_name: str,
+        start_date: datetime | None,
+        end_date: datetime | None,
+    ):
         stmt = select(SalesData).where(SalesData.branch_name == branch_name)
         if start_date:
             stmt = stmt.where(SalesData.date >= start_date)
         if end_date:
             stmt = stmt.where(SalesData.date <= end_date)
-        return list(self.session.scalars(stmt.order_by(SalesData.date)))
+        return stmt.order_by(SalesData.date)
 
     def count_sales(self) -> int:
         """Count total sales records."""
         return self.session.scalar(select(func.count(SalesData.id))) or 0
 
+    def iter_sales_rows(
+        self, columns: list[str] | None = None, batch_size: int = 10_000
+    ) -> Iterator[Row]:
+        """
+        Stream sales data as lightweight Row tuples, without building ORM instances.
+
+        Rows are fetched from the cursor in batches of ``batch_size``, so memory
+        stays flat however large the table is.
+
+        Args:
+            columns: SalesData column names to select. Defaults to all columns.
+            batch_size: Rows fetched per round-trip.
+
+        Yields:
+            Row tuples in the order of ``columns``.
+        """
+        table = SalesData.__table__
+        cols = [table.c[name] for name in columns] if columns else list(table.c)
+        result = self.session.execute(
+            select(*cols).execution_options(yield_per=batch_size)
+        )
+        yield from result
+
+    def get_sales_frame(self, columns: list[str] | None = None) -> "pd.DataFrame":
+        """
+        Load sales data column-wise into a DataFrame, bypassing ORM row hydration.
+
+        Args:
+            columns: SalesData column names to select. Defaults to all columns.
+
+        Returns:
+            DataFrame with one column per selected field.
+        """
+        import pandas as pd
+
+        table = SalesData.__table__
+        cols = [table.c[name] for name in columns] if columns else list(table.c)
+        return pd.read_sql(select(*cols), self.session.connection())
+
+    def export_sales_parquet(self, path: str | Path, columns: list[str] | None = None) -> int:
+        """
+        Write a columnar Parquet mirror of the sales table for ML feature extraction.
+
+        Training code can then read just the columns it needs with
+        ``pd.read_parquet(path, columns=[...])`` instead of iterating ORM objects.
+
+        Args:
+            path: Destination .parquet file.
+            columns: SalesData column names to export. Defaults to all columns.
+
+        Returns:
+            Number of rows written.
+        """
+        df = self.get_sales_frame(columns)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False, compression="zstd")
+        logger.info("Exported %d sales rows to %s", len(df), path)
+        return len(df)
+
     # --- Aggregate Queries ---
 
     def get_full_postcode_data(self, postcode: str) -> dict[str, Any]:
@@ -310,7 +452,25 @@ class PostcodeRepository:
         Returns a dict with keys: postcode, demographics, crystal, universities, places.
         Raises PostcodeNotFoundError if postcode doesn't exist.
         """
-        pc = self.get_postcode(postcode)
+        # One round-trip for the postcode plus its one-to-one tables (joined),
+        # one more for the places collection (selectin)
+        stmt = (
+            select(Postcode)
+            .where(Postcode.postcode == postcode)
+            .options(
+                joinedload(Postcode.demographics),
+                joinedload(Postcode.crystal_ethnicity),
+                joinedload(Postcode.crystal_restaurants),
+                joinedload(Postcode.crystal_pubs),
+                joinedload(Postcode.crystal_income),
+                joinedload(Postcode.crystal_transport),
+                joinedload(Postcode.crystal_occupation),
+                joinedload(Postcode.universities),
+                selectinload(Postcode.places),
+            )
+            .execution_options(populate_existing=True)
+        )
+        pc = self.session.execute(stmt).unique().scalar_one_or_none()
         if not pc:
             raise PostcodeNotFoundError(postcode=postcode)
 
@@ -324,16 +484,16 @@ class PostcodeRepository:
                 "min_prediction": pc.min_prediction,
                 "max_prediction": pc.max_prediction,
             },
-            "demographics": self._model_to_dict(self.get_demographics(postcode)),
+            "demographics": self._model_to_dict(pc.demographics),
             "crystal": {
-                "ethnicity": self._get_json_field(self.get_crystal_ethnicity(postcode), "ethnicity"),
-                "restaurants": self._get_json_field(self.get_crystal_restaurants(postcode), "restaurants"),
-                "pubs": self._get_json_field(self.get_crystal_pubs(postcode), "pubs"),
-                "income": self._get_json_field(self.get_crystal_income(postcode), "income"),
-                "transport": self._get_json_field(self.get_crystal_transport(postcode), "transport"),
-                "occupation": self._get_json_field(self.get_crystal_occupation(postcode), "occupation"),
+                "ethnicity": self._get_json_field(pc.crystal_ethnicity, "ethnicity"),
+                "restaurants": self._get_json_field(pc.crystal_restaurants, "restaurants"),
+                "pubs": self._get_json_field(pc.crystal_pubs, "pubs"),
+                "income": self._get_json_field(pc.crystal_income, "income"),
+                "transport": self._get_json_field(pc.crystal_transport, "transport"),
+                "occupation": self._get_json_field(pc.crystal_occupation, "occupation"),
             },
-            "universities": self._get_json_field(self.get_universities(postcode), "universities"),
+            "universities": self._get_json_field(pc.universities, "universities"),
             "places": [
                 {
                     "name": p.name,
@@ -342,10 +502,46 @@ class PostcodeRepository:
                     "reviews_average": p.reviews_average,
                     "place_type": p.place_type,
                 }
-                for p in self.get_places(postcode)
+                for p in pc.places
             ],
         }
 
+    def _dialect_insert(self):
+        """Return the dialect-specific insert() that supports ON CONFLICT."""
+        return pg_insert if self.session.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+    def _upsert(self, model_class, values: dict[str, Any], update_cols: list[str]) -> Any:
+        """
+        Insert a row, or update it on primary-key conflict, in one statement.
+
+        Emits INSERT ... ON CONFLICT DO UPDATE ... RETURNING (PostgreSQL and
+        SQLite) instead of a SELECT followed by an UPDATE or INSERT.
+
+        Args:
+            model_class: ORM model to write.
+            values: Column values for the INSERT, including the primary key.
+            update_cols: Columns to overwrite when the row already exists.
+
+        Returns:
+            The persisted model instance, refreshed in the session.
+        """
+        dialect_insert = self._dialect_insert()
+        pk_cols = [col.name for col in model_class.__table__.primary_key]
+
+        stmt = dialect_insert(model_class).values(**values)
+        set_ = {col: stmt.excluded[col] for col in update_cols}
+        if not set_:
+            # No-op update so RETURNING still yields the existing row
+            set_ = {col: stmt.excluded[col] for col in pk_cols}
+        elif "updated_at" in model_class.__table__.c:
+            # onupdate defaults don't fire for ON CONFLICT updates
+            set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=pk_cols, set_=set_).returning(model_class)
+
+        return self.session.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).one()
+
     @staticmethod
     def _model_to_dict(obj) -> Optional[dict]:
         """Convert a model instance to dict, excluding internal fields."""
@@ -3,17 +3,33 @@ Structured logging configuration.
 
 Replaces all print() debug statements with proper logging.
 Supports both console and file output with configurable levels.
+
+Callers only enqueue records; a background listener thread formats them and
+does the file/console writes, so logging never blocks a request or ingestion
+loop on disk I/O.
 """
 
+import atexit
 import logging
 import sys
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+from typing import Optional
+
+# Queue handler and listener from the last setup_logging() call, replaced on the next one
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
 
 
 def setup_logging(level: str = "INFO", log_file: str = "logs/location_analyzer.log") -> None:
     """
     Configure application logging.
 
+    Safe to call repeatedly (tests, worker restarts): handlers from a previous
+    call are stopped and replaced rather than stacked, so each record is written once.
+
     Args:
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Path to the log file
@@ -42,11 +58,17 @@ def setup_logging(level: str = "INFO", log_file: str = "logs/location_analyzer.l
     console_handler.setLevel(getattr(logging, level.upper(), logging.INFO))
     console_handler.setFormatter(console_formatter)
 
-    # Root logger
+    # Root logger — only enqueues; the listener thread writes to file and console
+    global _queue_handler, _listener
+    stop_logging()
+    queue: SimpleQueue = SimpleQueue()
+    _queue_handler = QueueHandler(queue)
+    _listener = QueueListener(queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
     root_logger = logging.getLogger("location_analyzer")
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(_queue_handler)
 
     # Suppress noisy third-party loggers
     for noisy_logger in ["urllib3", "selenium", "playwright", "httpx", "httpcore"]:
@@ -55,10 +77,34 @@ def setup_logging(level: str = "INFO", log_file: str = "logs/location_analyzer.l
     root_logger.info("Logging configured — level=%s, file=%s", level, log_file)
 
 
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the background writer started by setup_logging().
+
+    Registered with atexit; also call it before reading the log file back.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        logging.getLogger("location_analyzer").removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()  # drains the queue before returning
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+@lru_cache(maxsize=256)
 def get_logger(name: str) -> logging.Logger:
     """
     Get a named logger under the location_analyzer namespace.
 
+    Memoized, so repeat calls skip the name formatting and the logging
+    manager's lock.
+
     Usage:
         from location_analyzer.logging_config import get_logger
         logger = get_logger(__name__)
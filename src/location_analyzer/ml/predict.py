@@ -1,20 +1,74 @@
+import glob
+import hashlib
 import joblib
 import os
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Deserialized artifacts shared across PredictionService instances, keyed by
+# (model_dir, newest .pkl mtime) so re-exported models are picked up
+_ARTIFACT_CACHE: Dict[tuple, Dict[str, Any]] = {}
+_ARTIFACT_ATTRS = ('model', 'qt', 'kbd', 'pt', 'rs', 'oe')
+
 import sys
 from sklearn.base import BaseEstimator, RegressorMixin
 
+
+def _complete_rows(frame: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Row mask of entries with no missing values across the frame's columns.
+
+    Returns None when every row is complete (the common case), so callers can
+    transform the whole block without building a mask or fancy-indexing.
+    """
+    missing = pd.isna(frame.to_numpy())
+    if len(frame) and not missing.any():
+        return None
+    return ~missing.any(axis=1)
+
+
+def _transform_rows(
+    transformer, frame: pd.DataFrame, mask: Optional[np.ndarray], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Apply a fitted transformer to the rows of ``frame`` selected by ``mask``.
+
+    Args:
+        transformer: Fitted sklearn transformer.
+        frame: Input columns, in the order the transformer was fitted on.
+        mask: Rows to transform, from _complete_rows(); None means all of them.
+        out: Float array the transformed rows are written into. Defaults to a
+             float64 copy of ``frame``, so untransformed rows keep their values.
+
+    Returns:
+        A (rows, columns) float array ready to assign back as whole columns.
+    """
+    if mask is None:
+        return transformer.transform(frame)
+    if out is None:
+        out = frame.to_numpy(dtype=np.float64, copy=True)
+    out[mask] = transformer.transform(frame[mask])
+    return out
+
+
+# threadpool_limits changes process-wide state, so overlapping predict() calls
+# must not interleave their enter/exit or the original limits are never restored
+_THREADPOOL_LIMITS_LOCK = threading.Lock()
+
 class MedianEnsembleRegressor(BaseEstimator, RegressorMixin):
     """
     A custom wrapper class holding XGBoost, LightGBM, CatBoost, and Random Forest.
     Required here in __main__ module scope so joblib can deserialize the object exported from the notebook.
     """
+    # Batches at least this large run the four sub-models in parallel threads
+    PARALLEL_MIN_ROWS = 1000
+
     def __init__(self, xgb_model, lgb_model, cb_model, rf_model, rf_preprocessor, cat_features):
         self.xgb_model = xgb_model
         self.lgb_model = lgb_model
@@ -25,26 +79,42 @@ class MedianEnsembleRegressor(BaseEstimator, RegressorMixin):
         
     def predict(self, X):
         import numpy as np
+        # Normalize each categorical column to strings once; CatBoost takes them as-is,
+        # XGBoost/LightGBM share one frame with them as pandas categories.
+        # assign() builds each frame without an up-front full copy of X.
+        cat_str = {
+            col: X[col].fillna('Unknown').astype(str)
+            for col in self.cat_features if col in X.columns
+        }
+        X_xgb_lgb = X.assign(**{col: s.astype('category') for col, s in cat_str.items()})
+        X_cb = X.assign(**cat_str)
+
         X_rf = self.rf_preprocessor.transform(X)
-        preds_rf = self.rf_model.predict(X_rf)
-        
-        X_xgb_lgb = X.copy()
-        for col in self.cat_features:
-            if col in X_xgb_lgb.columns:
-                X_xgb_lgb[col] = X_xgb_lgb[col].fillna('Unknown').astype(str).astype('category')
-                
-        preds_xgb = self.xgb_model.predict(X_xgb_lgb)
-        preds_lgb = self.lgb_model.predict(X_xgb_lgb)
-        
-        X_cb = X.copy()
-        for col in self.cat_features:
-            if col in X_cb.columns:
-                X_cb[col] = X_cb[col].fillna('Unknown').astype(str)
-                
-        preds_cb = self.cb_model.predict(X_cb)
-        
-        all_preds = np.vstack([preds_rf, preds_xgb, preds_lgb, preds_cb])
-        return np.median(all_preds, axis=0)
+        jobs = [
+            (self.rf_model.predict, X_rf),
+            (self.xgb_model.predict, X_xgb_lgb),
+            (self.lgb_model.predict, X_xgb_lgb),
+            (self.cb_model.predict, X_cb),
+        ]
+        if len(X) >= self.PARALLEL_MIN_ROWS and (os.cpu_count() or 1) > 1:
+            # The four predictors run in native code that releases the GIL, so
+            # large batches score concurrently; small ones (or a single core) aren't
+            # worth the threads. Each model's own OpenMP/BLAS pool is capped at one
+            # thread meanwhile, so four multi-threaded predictors don't oversubscribe.
+            from joblib import Parallel, delayed
+            from threadpoolctl import threadpool_limits
+            with _THREADPOOL_LIMITS_LOCK, threadpool_limits(limits=1), \
+                    Parallel(n_jobs=len(jobs), backend='threading') as parallel:
+                preds = parallel(delayed(fn)(data) for fn, data in jobs)
+        else:
+            preds = [fn(data) for fn, data in jobs]
+
+        # Median of exactly four values = mean of the 2nd and 3rd smallest, found
+        # with a min/max network instead of stacking and sorting a (4, n) array
+        preds_rf, preds_xgb, preds_lgb, preds_cb = (np.asarray(p, dtype=np.float64) for p in preds)
+        low_a, high_a = np.minimum(preds_rf, preds_xgb), np.maximum(preds_rf, preds_xgb)
+        low_b, high_b = np.minimum(preds_lgb, preds_cb), np.maximum(preds_lgb, preds_cb)
+        return 0.5 * (np.maximum(low_a, low_b) + np.minimum(high_a, high_b))
 
 # Critical fix for FastAPI/uvicorn: map this class into the __main__ execution 
 # namespace so joblib can unpickle the model that was exported from Jupyter.
@@ -54,7 +124,12 @@ class PredictionService:
     """
     Loads the trained Median Ensemble (XGB, LGBM, CB, RF) and all associated 
     Scikit-Learn feature engineering transformers to provide real-time sales predictions.
+
+    Predictions are memoized per process by a hash of the engineered feature
+    frame, so a repeated batch skips the ensemble entirely.
     """
+    # Maximum number of feature batches kept in the prediction cache
+    PREDICTION_CACHE_SIZE = 4096
     
     def __init__(self, model_dir: str):
         self.model_dir = model_dir
@@ -66,16 +141,46 @@ class PredictionService:
         self.oe = None
         self._load_artifacts()
 
+        # Fixed per loaded model, so resolve once rather than on every prediction.
+        # Expected features come from the XGBoost sub-model if ensemble, else from the model itself.
+        self._expected_features = [
+            str(f) for f in getattr(getattr(self.model, 'xgb_model', self.model), 'feature_names_in_', [])
+        ]
+        self._cat_features_known = frozenset({'Day_of_Week', 'Nearest_Station_Type'})
+
+        # LRU of feature-hash -> predictions; predict_df is called from worker threads
+        self._pred_cache: OrderedDict[bytes, tuple] = OrderedDict()
+        self._pred_cache_lock = threading.Lock()
+
     def _load_artifacts(self):
-        """Loads all .pkl artifacts from the models directory."""
+        """Loads all model artifacts from the models directory, reusing a previous load if unchanged."""
+        artifact_paths = glob.glob(os.path.join(self.model_dir, "*.pkl")) + glob.glob(os.path.join(self.model_dir, "*.ubj"))
+        cache_key = (os.path.abspath(self.model_dir), max((os.path.getmtime(p) for p in artifact_paths), default=0.0))
+        cached = _ARTIFACT_CACHE.get(cache_key)
+        if cached is not None:
+            for attr_name, value in cached.items():
+                setattr(self, attr_name, value)
+            logger.debug(f"Reusing loaded ML artifacts from {self.model_dir}")
+            return
+
         try:
             model_path = os.path.join(self.model_dir, "median_ensemble.pkl")
-            if not os.path.exists(model_path):
-                # Fallback to the original XGBoost if the ensemble one doesn't exist
+            native_path = os.path.join(self.model_dir, "xgboost_sales_model_v2.ubj")
+            if os.path.exists(model_path):
+                self.model = joblib.load(model_path)
+                logger.info(f"Successfully loaded Ensemble model from {model_path}")
+            elif os.path.exists(native_path):
+                # Fallback to the original XGBoost, saved in XGBoost's native binary
+                # format (booster.save_model) — loads much faster than unpickling
+                from xgboost import XGBRegressor
+                self.model = XGBRegressor()
+                self.model.load_model(native_path)
+                logger.info(f"Successfully loaded XGBoost model from {native_path}")
+            else:
+                # Fallback to the original pickled XGBoost if neither exists
                 model_path = os.path.join(self.model_dir, "xgboost_sales_model_v2.pkl")
-                
-            self.model = joblib.load(model_path)
-            logger.info(f"Successfully loaded Ensemble model from {model_path}")
+                self.model = joblib.load(model_path)
+                logger.info(f"Successfully loaded XGBoost model from {model_path}")
             
             # Load transformers safely (they will be None if they don't exist)
             transformers = {
@@ -93,6 +198,8 @@ class PredictionService:
                     logger.debug(f"Loaded {filename}")
                 else:
                     logger.warning(f"Transformer {filename} not found. Ensure it was exported from Notebook.")
+
+            _ARTIFACT_CACHE[cache_key] = {attr_name: getattr(self, attr_name) for attr_name in _ARTIFACT_ATTRS}
                     
         except Exception as e:
             logger.error(f"Failed to load ML artifacts: {e}")
@@ -103,32 +210,32 @@ class PredictionService:
         Replicates the exact Feature Engineering pipeline from Section 5 of the Jupyter Notebook.
         """
         df_clean = df.copy()
-        df_clean = df_clean.astype(float, errors='ignore')
-
-        # 1. Population Capping (OOD Fix)
-        if 'population' in df_clean.columns:
-            df_clean['population'] = df_clean['population'].clip(lower=30000)
-
-        # 2. Log1p Transformations
-        log_cols = ['population', 'households', 'Distance_to_Nearest_Station']
-        for col in log_cols:
-            if col in df_clean.columns:
-                # Convert to float to avoid dtype mapping issues
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-                df_clean[col] = np.log1p(df_clean[col])
 
-        # 3. Sqrt Transformations
-        if 'Nearby_Station_Count' in df_clean.columns:
-            df_clean['Nearby_Station_Count'] = pd.to_numeric(df_clean['Nearby_Station_Count'], errors='coerce')
-            df_clean['Nearby_Station_Count'] = np.sqrt(df_clean['Nearby_Station_Count'])
+        # 1-3. Population Capping (OOD Fix), Log1p and Sqrt Transformations.
+        # Pulled out as one contiguous float64 block and transformed in place with
+        # ufuncs, rather than a pandas pass per column per step.
+        log_cols = [c for c in ('population', 'households', 'Distance_to_Nearest_Station') if c in df_clean.columns]
+        sqrt_cols = [c for c in ('Nearby_Station_Count',) if c in df_clean.columns]
+        num_cols = log_cols + sqrt_cols
+        if num_cols:
+            # Convert to float to avoid dtype mapping issues
+            block = df_clean[num_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+            n_log = len(log_cols)
+            if 'population' in log_cols:
+                population = block[:, log_cols.index('population')]
+                np.clip(population, 30000, None, out=population)
+            np.log1p(block[:, :n_log], out=block[:, :n_log])
+            np.sqrt(block[:, n_log:], out=block[:, n_log:])
+            df_clean[num_cols] = block
 
         # 4. QuantileTransformer (non-white)
         if 'non-white' in df_clean.columns and self.qt is not None:
-            mask = df_clean['non-white'].notna()
-            df_clean['non-white_quantile'] = np.nan
-            if mask.sum() > 0:
-                values = df_clean.loc[mask, ['non-white']]
-                df_clean.loc[mask, 'non-white_quantile'] = self.qt.transform(values)
+            values = df_clean[['non-white']]
+            mask = _complete_rows(values)
+            quantiles = np.full((len(values), 1), np.nan)
+            if mask is None or mask.any():
+                quantiles = _transform_rows(self.qt, values, mask, quantiles)
+            df_clean['non-white_quantile'] = quantiles[:, 0]
 
         # 5. KBinsDiscretizer (unemployed, ab, de)
         kmeans_cols = ['unemployed', 'ab', 'de']
@@ -137,42 +244,41 @@ class PredictionService:
             # We must pass the df chunk that has these columns
             available_cols = [c for c in kmeans_cols if c in df_clean.columns]
             if len(available_cols) > 0:
+                values = df_clean[available_cols]
                 # Find rows where ALL required columns are not null for the transform
-                mask = df_clean[available_cols].notna().all(axis=1)
-                
-                # Initialize the new columns with NaN
-                for col in available_cols:
-                    df_clean[f'{col}_kmeans_bin'] = np.nan
-                    
-                if mask.sum() > 0:
+                # (None when every row is complete)
+                mask = _complete_rows(values)
+
+                # The new bin columns stay NaN for incomplete rows
+                bins = np.full((len(values), len(available_cols)), np.nan)
+                if mask is None or mask.any():
                     try:
                         # kbd.transform expects the exact same columns it was fitted on.
                         # We must pull out exactly the columns it trained on.
-                        transformed = self.kbd.transform(df_clean.loc[mask, available_cols])
-                        for idx, col in enumerate(available_cols):
-                            df_clean.loc[mask, f'{col}_kmeans_bin'] = transformed[:, idx]
+                        bins = _transform_rows(self.kbd, values, mask, bins)
                     except Exception as e:
                         logger.warning(f"Error applying KBinsDiscretizer: {e}")
+                df_clean[[f'{col}_kmeans_bin' for col in available_cols]] = bins
 
         # 6. Yeo-Johnson (working, c1/c2)
         yeo_cols = ['working', 'c1/c2']
         if self.pt is not None:
             available_cols = [c for c in yeo_cols if c in df_clean.columns]
             if len(available_cols) > 0:
-                mask = df_clean[available_cols].notna().all(axis=1)
-                if mask.sum() > 0:
+                values = df_clean[available_cols]
+                mask = _complete_rows(values)
+                if mask is None or mask.any():
                     try:
-                        transformed = self.pt.transform(df_clean.loc[mask, available_cols])
-                        for idx, col in enumerate(available_cols):
-                            df_clean.loc[mask, col] = transformed[:, idx]
+                        df_clean[available_cols] = _transform_rows(self.pt, values, mask)
                     except Exception as e:
                         logger.warning(f"Error applying PowerTransformer: {e}")
 
         # 7. RobustScaler (avg_household_income)
         if 'avg_household_income' in df_clean.columns and self.rs is not None:
-            mask = df_clean['avg_household_income'].notna()
-            if mask.sum() > 0:
-                df_clean.loc[mask, 'avg_household_income'] = self.rs.transform(df_clean.loc[mask, ['avg_household_income']])
+            values = df_clean[['avg_household_income']]
+            mask = _complete_rows(values)
+            if mask is None or mask.any():
+                df_clean['avg_household_income'] = _transform_rows(self.rs, values, mask)[:, 0]
 
         # 8. Suspicious Zeros flag
         if 'unemployment_rate' in df_clean.columns:
@@ -180,17 +286,23 @@ class PredictionService:
 
         # 9. OrdinalEncoder (Transport_Accessibility_Score)
         if 'Transport_Accessibility_Score' in df_clean.columns and self.oe is not None:
-            mask = df_clean['Transport_Accessibility_Score'].notna()
-            if mask.sum() > 0:
-                df_clean.loc[mask, 'Transport_Accessibility_Score'] = self.oe.transform(df_clean.loc[mask, ['Transport_Accessibility_Score']])
+            values = df_clean[['Transport_Accessibility_Score']]
+            mask = _complete_rows(values)
+            if mask is None or mask.any():
+                df_clean['Transport_Accessibility_Score'] = _transform_rows(self.oe, values, mask)[:, 0]
 
         # 10. Date Extractions
         if 'Date' in df_clean.columns:
-            df_clean['Date'] = pd.to_datetime(df_clean['Date'], errors='coerce', format='mixed')
+            # ISO dates parse on the fast fixed-format path (cache=True parses each
+            # distinct string once); anything else falls back to per-value inference
+            try:
+                df_clean['Date'] = pd.to_datetime(df_clean['Date'], format='%Y-%m-%d', errors='raise', cache=True)
+            except (ValueError, TypeError):
+                df_clean['Date'] = pd.to_datetime(df_clean['Date'], errors='coerce', format='mixed')
             df_clean['Year'] = df_clean['Date'].dt.year
             df_clean['Month'] = df_clean['Date'].dt.month
             df_clean['Dayofweek'] = df_clean['Date'].dt.dayofweek
-            df_clean['Is_Weekend'] = df_clean['Dayofweek'].apply(lambda x: 1 if x >= 5 else 0)
+            df_clean['Is_Weekend'] = (df_clean['Dayofweek'] >= 5).astype(int)
         else:
             # Default to today if Date isn't provided in the API call
             from datetime import datetime
@@ -200,24 +312,17 @@ class PredictionService:
             df_clean['Dayofweek'] = now.weekday()
             df_clean['Is_Weekend'] = 1 if now.weekday() >= 5 else 0
 
-        # Construct final ordered DataFrame
-        # Get expected features from the XGBoost sub-model if ensemble, else from the model itself
-        expected_features = getattr(self.model.xgb_model, 'feature_names_in_', getattr(self.model, 'feature_names_in_', []))
-        
-        for f in expected_features:
-            if f not in df_clean.columns:
-                df_clean[f] = np.nan
-        
-        df_final = df_clean[expected_features].copy()
+        # Construct final ordered DataFrame: select the expected features and add any
+        # missing ones as NaN columns in a single reindex
+        df_final = df_clean.reindex(columns=self._expected_features)
 
         # Convert remaining object columns to float to avoid generic native typing errors
-        # (The Ensemble class will handle the explicit categorical conversions internally)
-        cat_features_known = ['Day_of_Week', 'Nearest_Station_Type']
-        for col in df_final.columns:
-            if df_final[col].dtype == 'object' and col not in cat_features_known:
-                 df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+        # (The Ensemble class will handle the explicit categorical conversions internally).
+        # Found with one dtype mask; select_dtypes('object') would also sweep in pandas 3 'str' columns.
+        obj_cols = df_final.columns[df_final.dtypes.eq(object).to_numpy()].difference(self._cat_features_known)
+        if len(obj_cols):
+            df_final[obj_cols] = df_final[obj_cols].apply(pd.to_numeric, errors='coerce')
 
-        df_final.columns = [str(c) for c in df_final.columns]
         return df_final
 
     def predict(self, raw_data: List[Dict[str, Any]]) -> List[float]:
@@ -228,17 +333,43 @@ class PredictionService:
         if not raw_data:
             return []
 
-        df_raw = pd.DataFrame(raw_data)
-        
+        return self.predict_df(pd.DataFrame(raw_data))
+
+    def predict_df(self, df_raw: pd.DataFrame) -> List[float]:
+        """
+        Same as predict(), but takes a DataFrame of raw feature rows directly,
+        so batch callers can skip building an intermediate list of dicts.
+        """
+        if df_raw.empty:
+            return []
+
         # 1. Feature Engineer
         df_processed = self._apply_feature_engineering(df_raw)
+
+        # Serve a repeated feature batch from the cache
+        cache_key = hashlib.blake2b(
+            pd.util.hash_pandas_object(df_processed, index=False).to_numpy().tobytes(), digest_size=16
+        ).digest()
+        with self._pred_cache_lock:
+            cached = self._pred_cache.get(cache_key)
+            if cached is not None:
+                self._pred_cache.move_to_end(cache_key)
+                return list(cached)
         
         # 2. Predict (outputs in Log-Space)
         log_preds = self.model.predict(df_processed)
         
-        # 3. Transform back to Real £ Sales and clip minimum to £0
-        sales_preds = np.expm1(log_preds)
-        sales_preds = np.clip(sales_preds, a_min=0, a_max=None)
+        # 3. Transform back to Real £ Sales and clip minimum to £0,
+        # in place on the model's output buffer when it is writable
+        log_preds = np.asarray(log_preds)
+        sales_preds = np.expm1(log_preds, out=log_preds if log_preds.flags.writeable else None)
+        np.maximum(sales_preds, 0, out=sales_preds)
+        result = sales_preds.tolist()
+
+        with self._pred_cache_lock:
+            self._pred_cache[cache_key] = tuple(result)
+            while len(self._pred_cache) > self.PREDICTION_CACHE_SIZE:
+                self._pred_cache.popitem(last=False)
         
-        return sales_preds.tolist()
+        return result
 
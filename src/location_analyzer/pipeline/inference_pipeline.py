@@ -1,8 +1,11 @@
 import logging
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Tuple
 
-from location_analyzer.scrapers.streetcheck import DemographicsScraper
+from location_analyzer.scrapers.streetcheck import DemographicsScraper, demographics_complete
 from location_analyzer.scrapers.crystalroof import CrystalRoofScraper
 
 logger = logging.getLogger(__name__)
@@ -14,7 +17,19 @@ class InferencePipeline:
         # Initialize scrapers
         self.demo_scraper = DemographicsScraper()
         self.cr_scraper = CrystalRoofScraper()
+        # Keep-alive session for postcodes.io, so repeat geocodes skip the TLS handshake
+        self._geo_session = requests.Session()
+        self._geo_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+        # Postcodes repeat across requests and never move; successful lookups are
+        # memoized per process (failures raise, so they are retried next time)
+        self._geocode_cached = lru_cache(maxsize=10000)(self._request_geocode)
         
+    def close(self) -> None:
+        """Release resources held by the scrapers (called on app shutdown)."""
+        self._geo_session.close()
+        self.demo_scraper.close()
+        self.cr_scraper.close()
+
     def _get_outercode(self, postcode: str) -> str:
         """Extracts the outercode from a standard UK format postcode."""
         return postcode.strip().split()[0].upper()
@@ -22,15 +37,19 @@ class InferencePipeline:
     def _geocode_postcode(self, postcode: str) -> dict:
         """Resolve postcode to lat/lng via the free postcodes.io API."""
         try:
-            url = f"https://api.postcodes.io/postcodes/{postcode.replace(' ', '%20')}"
-            resp = requests.get(url, timeout=10)
-            if resp.status_code == 200:
-                data = resp.json().get("result", {})
-                return {"lat": data.get("latitude"), "lng": data.get("longitude")}
+            return dict(self._geocode_cached(postcode.upper().replace(" ", "")))
         except Exception as e:
             logger.warning("Geocoding failed for %s: %s", postcode, e)
         return {}
 
+    def _request_geocode(self, postcode_key: str) -> dict:
+        """Fetch lat/lng for a space-less, uppercase postcode; raises on any failure."""
+        url = f"https://api.postcodes.io/postcodes/{postcode_key}"
+        resp = self._geo_session.get(url, timeout=10)
+        resp.raise_for_status()
+        data = resp.json().get("result", {})
+        return {"lat": data.get("latitude"), "lng": data.get("longitude")}
+
     def _flatten_crystalroof(self, cr_data: dict) -> dict:
         """
         Flatten the nested CrystalRoof output into the flat column names 
@@ -84,13 +103,34 @@ class InferencePipeline:
         Executes the scraping pipeline for a given postcode and formats the 
         output dictionary into the exact schema expected by XGBoost `PredictionService`.
         """
+        return self.run_with_status(postcode)[0]
+
+    def run_with_status(self, postcode: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Same as run(), but also reports whether every scraper returned data.
+
+        Scraper failures are logged and leave their features out rather than
+        raising, so callers caching the result should only do so when complete.
+
+        Returns:
+            (features, complete) — complete is False if demographics or
+            CrystalRoof raised, or came back without population / transport data.
+        """
         logger.info(f"Starting Inference Pipeline for Postcode: {postcode}")
         
         outercode = self._get_outercode(postcode)
+
+        # Demographics, CrystalRoof and geocoding are independent network calls, so
+        # start all three at once. The pool is per call: a shared one would make
+        # concurrent requests (run via asyncio.to_thread) queue for its workers.
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="inference-pipeline") as executor:
+            demo_future = executor.submit(self.demo_scraper.scrape_cached, postcode)
+            cr_future = executor.submit(self.cr_scraper.scrape, postcode)
+            geo_future = executor.submit(self._geocode_postcode, postcode)
         
-        # 1. Scrape Demographics (Nomis API + Doogal)
+        # 1. Scrape Demographics (Nomis API + Doogal), served from cache when fresh
         try:
-            demo_data = self.demo_scraper.scrape(postcode)
+            demo_data = demo_future.result()
             logger.info(f"Demographics scraped: {demo_data}")
         except Exception as e:
             logger.error(f"Failed to scrape demographics for {postcode}: {e}")
@@ -98,7 +138,7 @@ class InferencePipeline:
 
         # 2. Scrape CrystalRoof for Transport/Amenities
         try:
-            cr_data = self.cr_scraper.scrape(postcode)
+            cr_data = cr_future.result()
             logger.info(f"CrystalRoof scraped: {cr_data}")
         except Exception as e:
             logger.error(f"Failed to scrape CrystalRoof for {postcode}: {e}")
@@ -123,8 +163,11 @@ class InferencePipeline:
         combined['outercode'] = outercode
 
         # 5. Geocode the postcode for the map pin
-        geo = self._geocode_postcode(postcode)
+        geo = geo_future.result()
         if geo:
             combined.update(geo)
         
-        return combined
+        # Both scrapers return populated-looking dicts on failure (population=0,
+        # empty CrystalRoof sections), so check the parts the model relies on
+        complete = demographics_complete(demo_data) and bool(cr_data.get("transport"))
+        return combined, complete
@@ -32,6 +32,9 @@ from location_analyzer.exceptions import (
 
 logger = get_logger(__name__)
 
+# Playwright resource types aborted in headless runs — scrapers only read text/DOM
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
 
 class BaseScraper(abc.ABC):
     """
@@ -88,17 +91,12 @@ class BaseScraper(abc.ABC):
         When using arguments (like radius_miles), the cache key incorporates them
         to ensure uniqueness.
         """
-        # Create a unique cache key including kwargs if present
-        cache_key = postcode
-        if kwargs:
-            # Sort kwargs for deterministic key (e.g. "SW1A 1AA|radius_miles=2.0")
-            arg_str = "|".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            cache_key = f"{postcode}|{arg_str}"
+        cache_key = self._cache_key(postcode, **kwargs)
 
         try:
             data = self.scrape(postcode, **kwargs)
             # Cache successful result
-            if self.CACHE_CATEGORY and data:
+            if self.CACHE_CATEGORY and self._should_cache(data):
                 self._cache.set(self.CACHE_CATEGORY, cache_key, data)
             return data
         except ScraperError as e:
@@ -109,6 +107,36 @@ class BaseScraper(abc.ABC):
                 return cached
             raise
 
+    def scrape_cached(self, postcode: str, **kwargs) -> dict[str, Any]:
+        """
+        Serve a fresh cache entry if one exists, otherwise scrape with fallback.
+
+        Chain: Cached data (within TTL) → Live scrape → Raise error
+
+        Use for sources that change slowly (e.g. Census demographics), where a
+        cache hit saves seconds of network round-trips on repeat postcodes.
+        """
+        if self.CACHE_CATEGORY:
+            cache_key = self._cache_key(postcode, **kwargs)
+            cached = self._cache.get(self.CACHE_CATEGORY, cache_key)
+            if cached:
+                logger.info("Cache hit for %s/%s", self.CACHE_CATEGORY, cache_key)
+                return cached
+        return self.scrape_with_fallback(postcode, **kwargs)
+
+    @staticmethod
+    def _cache_key(postcode: str, **kwargs) -> str:
+        """Build a unique cache key including kwargs if present."""
+        if not kwargs:
+            return postcode
+        # Sort kwargs for deterministic key (e.g. "SW1A 1AA|radius_miles=2.0")
+        arg_str = "|".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+        return f"{postcode}|{arg_str}"
+
+    def _should_cache(self, data: dict[str, Any]) -> bool:
+        """Whether a scrape result is worth caching. Override for partial-failure checks."""
+        return bool(data)
+
     # ─── HTTP Requests ──────────────────────────────────────
 
     @property
@@ -295,6 +323,21 @@ class BaseScraper(abc.ABC):
 
         return None  # Let undetected-chromedriver figure it out
 
+    @staticmethod
+    def block_heavy_resources(context) -> None:
+        """
+        Abort image/font/media requests on a Playwright browser context.
+
+        Pages are only parsed for text, so skipping these cuts bandwidth and
+        render time. Stylesheets are kept so element visibility checks still work.
+        """
+        context.route(
+            "**/*",
+            lambda route: route.abort()
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+            else route.continue_(),
+        )
+
     def close_browser(self) -> None:
         """Close the browser if open."""
         if self._browser is not None:
@@ -340,11 +383,16 @@ class BaseScraper(abc.ABC):
 
     # ─── Context Manager ────────────────────────────────────
 
+    def close(self) -> None:
+        """Release the browser and HTTP session, if any were opened."""
+        self.close_browser()
+        if self._session:
+            self._session.close()
+            self._session = None
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close_browser()
-        if self._session:
-            self._session.close()
+        self.close()
         return False
@@ -64,6 +64,7 @@ class CrystalRoofScraper(BaseScraper):
                 user_agent=self._ua.random,
                 viewport={"width": 1280, "height": 800}
             )
+            self.block_heavy_resources(context)
             page = context.new_page()
 
             try:
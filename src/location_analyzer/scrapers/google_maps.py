@@ -42,6 +42,7 @@ class GoogleMapsScraper(BaseScraper):
             context = browser.new_context(
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             )
+            self.block_heavy_resources(context)
             page = context.new_page()
 
             for category in categories:
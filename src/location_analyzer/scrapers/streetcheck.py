@@ -32,6 +32,7 @@ Updated: 2026-02-23  (replaced Playwright-based postcodearea/streetcheck scraper
 import csv
 import io
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
@@ -54,6 +55,7 @@ DS_HOUSEHOLDS = "NM_2023_1"   # TS003
 DS_ETHNICITY  = "NM_2041_1"   # TS021
 DS_NSSEC      = "NM_2079_1"   # TS062  (NS-SeC → maps to AB/C1C2/DE)
 DS_ECON       = "NM_2083_1"   # TS066  (Economic Activity)
+NOMIS_DATASETS = (DS_POPULATION, DS_HOUSEHOLDS, DS_ETHNICITY, DS_NSSEC, DS_ECON)
 
 # Doogal
 DOOGAL_URL = "https://www.doogal.co.uk/ShowMap?postcode={postcode}"
@@ -154,6 +156,16 @@ def _pct(part: float, total: float) -> float:
     return round(part / total, 3) if total else 0.0
 
 
+def demographics_complete(data: dict[str, Any]) -> bool:
+    """
+    Whether a demographics result is usable.
+
+    scrape() still returns a full dict when the Nomis queries fail, just with
+    population=0, so an empty-dict check isn't enough.
+    """
+    return bool(data) and data.get("population", 0) > 0
+
+
 # ─── Main Scraper ────────────────────────────────────────
 class DemographicsScraper(BaseScraper):
     """
@@ -196,9 +208,19 @@ class DemographicsScraper(BaseScraper):
 
         result: dict[str, Any] = {}
 
+        # The Nomis queries and the Doogal lookup are independent network calls;
+        # run them concurrently so wall time is the slowest call, not the sum.
+        # Errors surface from .result() inside each section's try block below.
+        with ThreadPoolExecutor(max_workers=len(NOMIS_DATASETS) + 1) as pool:
+            nomis = {
+                ds: pool.submit(_nomis_csv, ds, postcode, self._nomis_uid)
+                for ds in NOMIS_DATASETS
+            }
+            income = pool.submit(self._fetch_doogal_income, postcode)
+
         # ── 1. Population (TS001) ───────────────────────────
         try:
-            pop_rows = _nomis_csv(DS_POPULATION, postcode, self._nomis_uid)
+            pop_rows = nomis[DS_POPULATION].result()
             result["population"] = _total_row(pop_rows)
             logger.info("Population: %s", result["population"])
         except Exception as e:
@@ -207,7 +229,7 @@ class DemographicsScraper(BaseScraper):
 
         # ── 2. Households (TS003) ───────────────────────────
         try:
-            hh_rows = _nomis_csv(DS_HOUSEHOLDS, postcode, self._nomis_uid)
+            hh_rows = nomis[DS_HOUSEHOLDS].result()
             result["households"] = _total_row(hh_rows)
             logger.info("Households: %s", result["households"])
         except Exception as e:
@@ -216,7 +238,7 @@ class DemographicsScraper(BaseScraper):
 
         # ── 3. Ethnicity (TS021) ────────────────────────────
         try:
-            eth_rows = _nomis_csv(DS_ETHNICITY, postcode, self._nomis_uid)
+            eth_rows = nomis[DS_ETHNICITY].result()
             total_eth = _total_row(eth_rows)
 
             # Dynamically find the NAME column (could be C2021_ETH_20_NAME or C2021_ETH_9_NAME)
@@ -240,7 +262,7 @@ class DemographicsScraper(BaseScraper):
 
         # ── 4. Economic Activity (TS066) ────────────────────
         try:
-            econ_rows = _nomis_csv(DS_ECON, postcode, self._nomis_uid)
+            econ_rows = nomis[DS_ECON].result()
             total_econ = _total_row(econ_rows)  # All residents 16+
 
             # Dynamically find the NAME column (e.g. C2021_EASTAT_20_NAME)
@@ -281,7 +303,7 @@ class DemographicsScraper(BaseScraper):
 
         # ── 5. NS-SeC → Social Grades AB/C1C2/DE (TS062) ───
         try:
-            nssec_rows = _nomis_csv(DS_NSSEC, postcode, self._nomis_uid)
+            nssec_rows = nomis[DS_NSSEC].result()
             total_nssec = _total_row(nssec_rows)
 
             # Dynamically find the NAME column
@@ -331,7 +353,7 @@ class DemographicsScraper(BaseScraper):
 
         # ── 6. Avg Household Income (Doogal) ────────────────
         try:
-            result["avg_household_income"] = self._fetch_doogal_income(postcode)
+            result["avg_household_income"] = income.result()
             logger.info("Avg household income: £%s", result["avg_household_income"])
         except Exception as e:
             logger.warning("Doogal income scrape failed: %s", e)
@@ -340,6 +362,10 @@ class DemographicsScraper(BaseScraper):
         logger.info("Demographics complete for %s: %s", postcode, result)
         return result
 
+    def _should_cache(self, data: dict[str, Any]) -> bool:
+        """Don't cache lookups where the Nomis population query failed."""
+        return demographics_complete(data)
+
     # ─── Doogal Income Scraper (Playwright) ───────────────────
     def _fetch_doogal_income(self, postcode: str) -> int:
         """
@@ -347,7 +373,8 @@ class DemographicsScraper(BaseScraper):
 
         Opens a browser (visible if headless=False), navigates to the Doogal
         postcode map page, waits for content, and extracts the income value.
-        Retries up to 2 times on timeout.
+        Retries up to 2 times on timeout. Chromium is launched once and shared
+        by all attempts; each attempt gets its own fresh browser context.
 
         Returns the income as an integer (e.g. 68500), or 0 on failure.
         """
@@ -356,94 +383,96 @@ class DemographicsScraper(BaseScraper):
         logger.info("Doogal request (Playwright, headless=%s): %s", self.headless, url)
 
         max_attempts = 3
-        for attempt in range(1, max_attempts + 1):
+        with sync_playwright() as pw:
+            browser = pw.chromium.launch(headless=self.headless)
             try:
-                return self._fetch_doogal_income_attempt(url, postcode, attempt)
-            except Exception as e:
-                logger.warning(
-                    "Doogal attempt %d/%d failed for %s: %s",
-                    attempt, max_attempts, postcode, e,
-                )
-                if attempt == max_attempts:
-                    return 0
+                for attempt in range(1, max_attempts + 1):
+                    try:
+                        return self._fetch_doogal_income_attempt(browser, url, postcode, attempt)
+                    except Exception as e:
+                        logger.warning(
+                            "Doogal attempt %d/%d failed for %s: %s",
+                            attempt, max_attempts, postcode, e,
+                        )
+            finally:
+                browser.close()
 
         return 0
 
-    def _fetch_doogal_income_attempt(self, url: str, postcode: str, attempt: int) -> int:
-        """Single attempt to fetch income from Doogal via Playwright."""
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(headless=self.headless)
-            context = browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/131.0.0.0 Safari/537.36"
-                )
+    def _fetch_doogal_income_attempt(self, browser, url: str, postcode: str, attempt: int) -> int:
+        """Single attempt to fetch income from Doogal in a fresh context on the shared browser."""
+        context = browser.new_context(
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/131.0.0.0 Safari/537.36"
             )
-            page = context.new_page()
-
-            try:
-                page.goto(url, timeout=40000, wait_until="domcontentloaded")
-                # Wait for the demographics section to render
-                page.wait_for_timeout(3000)
-
-                html = page.content()
-                soup = BeautifulSoup(html, "html.parser")
-
-                # ── Strategy 1: Exact Doogal structure ──────────────
-                # <th>Average household income (2020) ...</th>
-                # <td colspan="2">
-                #   <div class="progress">
-                #     <div class="progress-bar">
-                #       <span class="show">£68,500</span>
-                for th in soup.find_all("th"):
-                    text = th.get_text(strip=True)
-                    if "average household income" in text.lower():
-                        next_td = th.find_next_sibling("td")
-                        if next_td:
-                            # Look for <span class="show"> inside the progress bar
-                            span = next_td.find("span", class_="show")
-                            if span:
-                                match = re.search(r"£([\d,]+)", span.get_text(strip=True))
-                                if match:
-                                    income = int(match.group(1).replace(",", ""))
-                                    logger.info("Doogal income found (span.show): £%s", f"{income:,}")
-                                    return income
-                            # Fallback: any £ amount in the td
-                            match = re.search(r"£([\d,]+)", next_td.get_text())
-                            if match:
-                                income = int(match.group(1).replace(",", ""))
-                                logger.info("Doogal income found (td text): £%s", f"{income:,}")
-                                return income
+        )
+        if self.headless:
+            self.block_heavy_resources(context)
+        page = context.new_page()
 
-                # ── Strategy 2: Also check <td> labels (in case structure changes)
-                for td in soup.find_all("td"):
-                    text = td.get_text(strip=True)
-                    if "average household income" in text.lower():
-                        next_td = td.find_next_sibling("td")
-                        if next_td:
-                            match = re.search(r"£([\d,]+)", next_td.get_text())
+        try:
+            page.goto(url, timeout=40000, wait_until="domcontentloaded")
+            # Wait for the demographics section to render
+            page.wait_for_timeout(3000)
+
+            html = page.content()
+            soup = BeautifulSoup(html, "html.parser")
+
+            # ── Strategy 1: Exact Doogal structure ──────────────
+            # <th>Average household income (2020) ...</th>
+            # <td colspan="2">
+            #   <div class="progress">
+            #     <div class="progress-bar">
+            #       <span class="show">£68,500</span>
+            for th in soup.find_all("th"):
+                text = th.get_text(strip=True)
+                if "average household income" in text.lower():
+                    next_td = th.find_next_sibling("td")
+                    if next_td:
+                        # Look for <span class="show"> inside the progress bar
+                        span = next_td.find("span", class_="show")
+                        if span:
+                            match = re.search(r"£([\d,]+)", span.get_text(strip=True))
                             if match:
                                 income = int(match.group(1).replace(",", ""))
-                                logger.info("Doogal income found (td fallback): £%s", f"{income:,}")
+                                logger.info("Doogal income found (span.show): £%s", f"{income:,}")
                                 return income
+                        # Fallback: any £ amount in the td
+                        match = re.search(r"£([\d,]+)", next_td.get_text())
+                        if match:
+                            income = int(match.group(1).replace(",", ""))
+                            logger.info("Doogal income found (td text): £%s", f"{income:,}")
+                            return income
+
+            # ── Strategy 2: Also check <td> labels (in case structure changes)
+            for td in soup.find_all("td"):
+                text = td.get_text(strip=True)
+                if "average household income" in text.lower():
+                    next_td = td.find_next_sibling("td")
+                    if next_td:
+                        match = re.search(r"£([\d,]+)", next_td.get_text())
+                        if match:
+                            income = int(match.group(1).replace(",", ""))
+                            logger.info("Doogal income found (td fallback): £%s", f"{income:,}")
+                            return income
+
+            # ── Strategy 3: Full-page regex as last resort
+            page_text = soup.get_text()
+            match = re.search(
+                r"average\s+household\s+income.*?£([\d,]+)",
+                page_text,
+                re.IGNORECASE | re.DOTALL,
+            )
+            if match:
+                income = int(match.group(1).replace(",", ""))
+                logger.info("Doogal income found (regex): £%s", f"{income:,}")
+                return income
 
-                # ── Strategy 3: Full-page regex as last resort
-                page_text = soup.get_text()
-                match = re.search(
-                    r"average\s+household\s+income.*?£([\d,]+)",
-                    page_text,
-                    re.IGNORECASE | re.DOTALL,
-                )
-                if match:
-                    income = int(match.group(1).replace(",", ""))
-                    logger.info("Doogal income found (regex): £%s", f"{income:,}")
-                    return income
-
-                logger.warning("Could not find income on Doogal for %s", postcode)
-                return 0
+            logger.warning("Could not find income on Doogal for %s", postcode)
+            return 0
 
-            finally:
-                context.close()
-                browser.close()
+        finally:
+            context.close()
 
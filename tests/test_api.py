@@ -14,7 +14,7 @@ def mock_scrapers():
     with patch('location_analyzer.pipeline.inference_pipeline.DemographicsScraper') as mock_demo, \
          patch('location_analyzer.pipeline.inference_pipeline.CrystalRoofScraper') as mock_cr:
          
-        mock_demo.return_value.scrape.return_value = {
+        demo_data = {
             "population": 50000, 
             "avg_household_income": 40000,
             "working": 30000,
@@ -24,12 +24,23 @@ def mock_scrapers():
             "de": 5000,
             "non_white": 5000
         }
+        mock_demo.return_value.scrape.return_value = demo_data
+        mock_demo.return_value.scrape_cached.return_value = demo_data
         
         mock_cr.return_value.scrape.return_value = {
-            "Distance_to_Nearest_Station": 0.5,
-            "Nearby_Station_Count": 3,
-            "Nearest_Station_Type": "Underground",
-            "Transport_Accessibility_Score": 5
+            "postcode": "SW1A 1AA",
+            "transport": {
+                "score": 5,
+                "stations": [
+                    {"name": "Westminster", "distance": 0.5, "type": "Underground"},
+                    {"name": "St James's Park", "distance": 0.6, "type": "Underground"},
+                    {"name": "Charing Cross", "distance": 0.8, "type": "National Rail"},
+                ],
+            },
+            "amenities": {"restaurants": [], "pubs": []},
+            "affluence": {},
+            "occupation": {},
+            "ethnicity": {}
         }
         
         yield mock_demo, mock_cr
@@ -40,6 +51,15 @@ def mock_model():
     # but we don't necessarily need to mock the model itself! The TestClient will run the true ML inference.
     pass
 
+@pytest.fixture
+def stub_model_service():
+    """Replace the PredictionService built at startup with a stub, so no .pkl models are needed."""
+    with patch('location_analyzer.api.main.PredictionService') as mock_service_cls, \
+         patch('location_analyzer.pipeline.inference_pipeline.InferencePipeline._geocode_postcode', return_value={}):
+        service = mock_service_cls.return_value
+        service.predict_df.side_effect = lambda df: [1000.0] * len(df)
+        yield service
+
 def test_health_check():
     client = TestClient(app)
     # the healthcheck doesn't use the db, but app startup might fail 
@@ -84,3 +104,56 @@ def test_predict_endpoint_missing_postcode(mock_scrapers, mock_model):
         }
         response = client.post("/predict", json=payload)
         assert response.status_code == 422 # Standard FastAPI validation error
+
+def test_predict_endpoint_serves_repeat_postcode_from_cache(mock_scrapers, stub_model_service):
+    mock_demo, _ = mock_scrapers
+    with TestClient(app) as client:
+        payload = {
+            "postcode": "SW1A 1AA",
+            "branch_name": "Test Branch"
+        }
+        first = client.post("/predict", json=payload)
+        second = client.post("/predict", json=payload)
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        # The second call must not re-run the scraping pipeline or the model
+        assert mock_demo.return_value.scrape_cached.call_count == 1
+        assert stub_model_service.predict_df.call_count == 1
+
+FAILED_CRYSTALROOF = {
+    "postcode": "SW1A 1AA",
+    "transport": {},
+    "amenities": {"restaurants": [], "pubs": []},
+    "affluence": {},
+    "occupation": {},
+    "ethnicity": {}
+}
+
+@pytest.mark.parametrize("failure", ["cr_raises", "cr_sections_empty", "demo_population_zero"])
+def test_predict_endpoint_does_not_cache_partial_scrape(mock_scrapers, stub_model_service, failure):
+    mock_demo, mock_cr = mock_scrapers
+    if failure == "cr_raises":
+        mock_cr.return_value.scrape.side_effect = RuntimeError("CrystalRoof unavailable")
+    elif failure == "cr_sections_empty":
+        # CrystalRoof page fetches failed, but scrape() still returns every section key
+        mock_cr.return_value.scrape.return_value = FAILED_CRYSTALROOF
+    else:
+        # Nomis failed: the demographics dict is full but population is 0
+        mock_demo.return_value.scrape_cached.return_value = {
+            "population": 0, "households": 0, "working": 0.0, "unemployed": 0.0
+        }
+    with TestClient(app) as client:
+        payload = {
+            "postcode": "SW1A 1AA",
+            "branch_name": "Test Branch"
+        }
+        first = client.post("/predict", json=payload)
+        second = client.post("/predict", json=payload)
+
+        # A forecast is still served, but the failed scrape is retried next time
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert mock_cr.return_value.scrape.call_count == 2
+        assert mock_demo.return_value.scrape_cached.call_count == 2
+        assert stub_model_service.predict_df.call_count == 2
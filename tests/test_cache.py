@@ -2,8 +2,10 @@
 Tests for the JSON file cache manager.
 """
 
+import hashlib
 import time
 
+import numpy as np
 import pytest
 
 from location_analyzer.data.cache import CacheManager
@@ -53,6 +55,44 @@ class TestCacheBasicOperations:
         result = cache.get("demographics", "SW1A 1AA")
         assert result == {"pop": 1}
 
+    def test_postcode_normalization_keeps_kwarg_suffix(self, cache):
+        """Should normalize only the postcode part of a 'postcode|k=v' key."""
+        cache.set("gmaps", "sw1a 1aa|place_type=Restaurant", {"n": 1})
+        assert cache.get("gmaps", "SW1A 1AA|place_type=Restaurant") == {"n": 1}
+        assert cache.get("gmaps", "SW1A 1AA|place_type=restaurant") is None
+
+    def test_canonical_keys_hash_unchanged(self, cache):
+        """Should keep the filename of already-canonical keys, so existing entries stay valid."""
+        key = "SW1A 1AA|radius_miles=2.0"
+        assert cache._safe_key(key) == hashlib.md5(key.encode("utf-8")).hexdigest()
+
+    def test_numpy_values_round_trip(self, cache):
+        """Should serialize numpy scalars as plain JSON numbers."""
+        cache.set("demographics", "SW1A 1AA", {"pop": np.int64(5), "ratio": np.float64(0.5)})
+        assert cache.get("demographics", "SW1A 1AA") == {"pop": 5, "ratio": 0.5}
+
+    def test_corrupt_file_returns_none(self, cache):
+        """Should treat an unreadable cache file as a miss."""
+        cache.set("demographics", "SW1A 1AA", {"pop": 1})
+        cache._path_for("demographics", "SW1A 1AA").write_bytes(b"{not json")
+        assert cache.get("demographics", "SW1A 1AA") is None
+
+    def test_corrupt_file_is_removed(self, cache):
+        """Should delete an undecodable entry so has() agrees with get()."""
+        cache.set("demographics", "SW1A 1AA", {"pop": 1})
+        cache._path_for("demographics", "SW1A 1AA").write_bytes(b"{not json")
+        assert cache.get("demographics", "SW1A 1AA") is None
+        assert cache.has("demographics", "SW1A 1AA") is False
+        assert not cache._path_for("demographics", "SW1A 1AA").exists()
+
+    def test_set_leaves_only_the_entry_file(self, cache):
+        """Should publish the entry atomically without leftover temp or lock files."""
+        cache.set("demographics", "SW1A 1AA", {"pop": 1})
+        cache.set("demographics", "SW1A 1AA", {"pop": 2})
+        files = list((cache.cache_dir / "demographics").iterdir())
+        assert [f.suffix for f in files] == [".json"]
+        assert cache.get("demographics", "SW1A 1AA") == {"pop": 2}
+
 
 class TestCacheTTL:
     """Tests for cache TTL (time-to-live) expiration."""
@@ -65,6 +105,13 @@ class TestCacheTTL:
         time.sleep(0.1)
         assert cache.get("demographics", "E1 6AN") is None
 
+    def test_has_respects_ttl(self, tmp_path):
+        """has() should report expired entries as missing."""
+        cache = CacheManager(cache_dir=str(tmp_path / "cache"), ttl_seconds=0)
+        cache.set("demographics", "E1 6AN", {"pop": 1})
+        time.sleep(0.1)
+        assert cache.has("demographics", "E1 6AN") is False
+
 
 class TestCacheClear:
     """Tests for clearing cache entries."""
@@ -107,3 +154,35 @@ class TestCacheStats:
         stats = cache.stats()
         assert stats["demographics"] == 2
         assert stats["crystal"] == 1
+
+
+class TestCacheDirectories:
+    """Tests for cache directory setup."""
+
+    def test_creates_category_dirs(self, tmp_path):
+        """Should create every category directory on first use."""
+        root = tmp_path / "fresh"
+        CacheManager(cache_dir=str(root))
+        for category in CacheManager.CATEGORIES:
+            assert (root / category).is_dir()
+
+    def test_skips_mkdir_when_already_prepared(self, tmp_path, monkeypatch):
+        """A second manager on the same root should not touch the filesystem."""
+        root = tmp_path / "warm"
+        CacheManager(cache_dir=str(root))
+
+        def fail_mkdir(*args, **kwargs):
+            raise AssertionError("mkdir should not be called")
+
+        monkeypatch.setattr(type(root), "mkdir", fail_mkdir)
+        CacheManager(cache_dir=str(root))
+
+    def test_set_recreates_deleted_category_dir(self, tmp_path):
+        """Should recreate a category directory removed after setup and still write."""
+        root = tmp_path / "pruned"
+        CacheManager(cache_dir=str(root))
+        (root / "gmaps").rmdir()
+
+        cache = CacheManager(cache_dir=str(root))
+        cache.set("gmaps", "SW1A 1AA", {"n": 1})
+        assert cache.get("gmaps", "SW1A 1AA") == {"n": 1}
@@ -149,3 +149,16 @@ class TestMainSettings:
         subsettings = ["database", "api", "scraper", "ml", "paths", "ngrok", "logging"]
         for name in subsettings:
             assert hasattr(settings, name), f"Missing sub-setting: {name}"
+
+    def test_subsettings_are_lazy_and_cached(self, monkeypatch):
+        """Sub-settings should be read from the environment on first access, then reused."""
+        settings = Settings()
+        monkeypatch.setenv("API_PORT", "9100")
+        assert settings.api.port == 9100
+        assert settings.api is settings.api
+
+    def test_global_settings_is_lazy(self):
+        """The module-level settings proxy should forward to a single shared Settings."""
+        from location_analyzer.config import get_settings, settings
+
+        assert settings.api is get_settings().api
@@ -7,8 +7,9 @@ All tests use SQLite in-memory — no external database required.
 import pytest
 from datetime import datetime
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from location_analyzer.data.database import Base, create_db_engine, create_session_factory, init_db
@@ -87,6 +88,14 @@ class TestDatabaseEngine:
             result = conn.execute(text("SELECT 1"))
             assert result.scalar() == 1
 
+    def test_sqlite_pragmas_applied(self):
+        """create_db_engine should apply the SQLite durability/caching PRAGMAs."""
+        eng = create_db_engine("sqlite:///:memory:")
+        with eng.connect() as conn:
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+
 
 # ─── ORM Model Tests ───────────────────────────────────────
 
@@ -119,10 +128,26 @@ class TestPostcodeModel:
         demo = Demographics(postcode="HA1 2TB", population=53000, households=22000)
         session.add(demo)
         session.flush()
+        session.expunge_all()
 
+        pc = session.scalars(
+            select(Postcode)
+            .where(Postcode.postcode == "HA1 2TB")
+            .options(selectinload(Postcode.demographics))
+        ).one()
         assert pc.demographics is not None
         assert pc.demographics.population == 53000
 
+    def test_relationship_lazy_load_raises(self, session):
+        """Unloaded relationships should raise instead of issuing a hidden query."""
+        session.add(Postcode(postcode="HA1 2TB", outercode="HA1"))
+        session.flush()
+        session.expunge_all()
+
+        pc = session.get(Postcode, "HA1 2TB")
+        with pytest.raises(InvalidRequestError):
+            _ = pc.demographics
+
 
 class TestDemographicsModel:
     """Tests for the Demographics ORM model."""
@@ -149,7 +174,7 @@ class TestDemographicsModel:
         session.add(demo)
         session.flush()
 
-        result = session.get(Demographics, demo.id)
+        result = session.get(Demographics, demo.postcode)
         assert result.population == 45000
         assert result.avg_household_income == 52000
 
@@ -228,6 +253,16 @@ class TestSalesModel:
         s = SalesData(branch_name="Test Branch", total_sale=100.0)
         assert "Test Branch" in repr(s)
 
+    def test_outercode_date_query_is_index_only(self, engine):
+        """Outercode/date-range scans of total_sale should be served by the covering index."""
+        with engine.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT date, total_sale FROM sales_data "
+                "WHERE outercode = 'CR0' AND date >= '2025-01-01'"
+            )).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "COVERING INDEX ix_sales_outercode_date_sale" in detail
+
 
 # ─── Repository Tests ──────────────────────────────────────
 
@@ -284,6 +319,69 @@ class TestPostcodeRepository:
         assert repo.get_postcode("DEL 1ET") is None
         assert repo.get_demographics("DEL 1ET") is None
 
+    def test_bulk_upsert_postcodes(self, repo, session):
+        """Should insert new rows and update existing ones without nulling fields."""
+        repo.upsert_postcode("E1 6AN", radius=1.0, address="Old Address")
+        session.commit()
+
+        written = repo.bulk_upsert_postcodes([
+            {"postcode": "E1 6AN", "radius": 2.5},
+            {"postcode": "SW1A 1AA", "prediction": 900.0},
+            {"postcode": "N1 9GU"},
+        ], chunk_size=2)
+        session.commit()
+        session.expire_all()
+
+        assert written == 3
+        updated = repo.get_postcode("E1 6AN")
+        assert updated.radius == 2.5
+        assert updated.address == "Old Address"
+        assert repo.get_postcode("SW1A 1AA").outercode == "SW1A"
+        assert repo.postcode_exists("N1 9GU")
+
+    def test_bulk_upsert_postcodes_merges_repeats(self, repo, session):
+        """A postcode repeated in one batch should be written once, later non-None values winning."""
+        written = repo.bulk_upsert_postcodes([
+            {"postcode": "E1 6AN", "radius": 1.0, "address": "First Address"},
+            {"postcode": "N1 9GU"},
+            {"postcode": "E1 6AN", "radius": 2.5, "address": None},
+        ])
+        session.commit()
+        session.expire_all()
+
+        assert written == 2
+        merged = repo.get_postcode("E1 6AN")
+        assert merged.radius == 2.5
+        assert merged.address == "First Address"
+
+    def test_outercode_is_uppercased(self, repo, session):
+        """Outercodes should be uppercase whether or not the postcode has a space."""
+        assert repo.upsert_postcode("sw1a 1aa").outercode == "SW1A"
+        assert repo.upsert_postcode("ha12tb").outercode == "HA1"
+
+    def test_child_upserts_skip_known_postcode_lookup(self, repo, session, monkeypatch):
+        """Once a postcode is known, child upserts shouldn't look it up again."""
+        repo.upsert_demographics("E1 6AN", population=1000)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("upsert_postcode should not be called")
+
+        monkeypatch.setattr(repo, "upsert_postcode", fail)
+        repo.upsert_crystal_ethnicity("E1 6AN", {"white": 50.0})
+        repo.upsert_crystal_pubs("E1 6AN", {"count": 2})
+        session.commit()
+        assert repo.get_crystal_pubs("E1 6AN").pubs == {"count": 2}
+
+    def test_child_upsert_after_rollback_rewrites_postcode(self, repo, session):
+        """A rollback should forget known postcodes so children still get a parent row."""
+        repo.upsert_postcode("E1 6AN")
+        session.rollback()
+
+        repo.upsert_crystal_pubs("E1 6AN", {"count": 2})
+        session.commit()
+        assert repo.postcode_exists("E1 6AN")
+        assert repo.get_crystal_pubs("E1 6AN").pubs == {"count": 2}
+
     def test_delete_nonexistent_postcode(self, repo):
         """Should return False for nonexistent postcode."""
         assert repo.delete_postcode("NOPE") is False
@@ -471,6 +569,16 @@ class TestSalesRepository:
         assert len(filtered) == 1
         assert filtered[0].total_sale == 1500.0
 
+    def test_iter_sales_by_branch(self, repo, session):
+        """Should stream a branch's records in date order across batches."""
+        for day in [20, 10, 15]:
+            repo.add_sales_record("Test Branch", datetime(2025, 1, day), 100.0 * day)
+        repo.add_sales_record("Other Branch", datetime(2025, 1, 12), 50.0)
+        session.commit()
+
+        streamed = repo.iter_sales_by_branch("Test Branch", start_date=datetime(2025, 1, 12), batch_size=1)
+        assert [r.total_sale for r in streamed] == [1500.0, 2000.0]
+
     def test_count_sales(self, repo, session):
         """Should count total sales records."""
         assert repo.count_sales() == 0
@@ -480,6 +588,55 @@ class TestSalesRepository:
 
         assert repo.count_sales() == 2
 
+    def test_bulk_add_sales_records(self, repo, session):
+        """Should insert a batch of rows and derive outercodes."""
+        inserted = repo.bulk_add_sales_records([
+            {"branch_name": "Branch A", "date": datetime(2025, 1, 1), "total_sale": 100.0, "postcode": "CR0 1NA"},
+            {"branch_name": "Branch A", "date": datetime(2025, 1, 2), "total_sale": 150.0, "postcode": "CR0 1NA"},
+            {"branch_name": "Branch B", "date": datetime(2025, 1, 1), "total_sale": 200.0},
+        ])
+        session.commit()
+
+        assert inserted == 3
+        assert repo.count_sales() == 3
+        branch_a = repo.get_sales_by_branch("Branch A")
+        assert [r.outercode for r in branch_a] == ["CR0", "CR0"]
+
+    def test_bulk_add_sales_records_empty(self, repo):
+        """Should be a no-op for an empty batch."""
+        assert repo.bulk_add_sales_records([]) == 0
+
+    def test_iter_sales_rows(self, repo, session):
+        """Should stream selected columns as plain row tuples."""
+        repo.add_sales_record("Branch A", datetime(2025, 1, 1), 100.0)
+        repo.add_sales_record("Branch B", datetime(2025, 1, 2), 200.0)
+        session.commit()
+
+        rows = list(repo.iter_sales_rows(["branch_name", "total_sale"], batch_size=1))
+        assert sorted(tuple(r) for r in rows) == [("Branch A", 100.0), ("Branch B", 200.0)]
+
+    def test_get_sales_frame(self, repo, session):
+        """Should return selected sales columns as a DataFrame."""
+        repo.add_sales_record("Branch A", datetime(2025, 1, 1), 100.0, postcode="CR0 1NA")
+        repo.add_sales_record("Branch B", datetime(2025, 1, 2), 200.0)
+        session.commit()
+
+        df = repo.get_sales_frame(["outercode", "date", "total_sale"])
+        assert list(df.columns) == ["outercode", "date", "total_sale"]
+        assert sorted(df["total_sale"]) == [100.0, 200.0]
+        assert set(df["outercode"].dropna()) == {"CR0"}
+
+    def test_export_sales_parquet(self, repo, session, tmp_path):
+        """Should write a Parquet mirror of the sales table."""
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("pyarrow")
+        repo.add_sales_record("Branch A", datetime(2025, 1, 1), 100.0)
+        session.commit()
+
+        path = tmp_path / "sales.parquet"
+        assert repo.export_sales_parquet(path, ["branch_name", "total_sale"]) == 1
+        assert pd.read_parquet(path)["total_sale"].tolist() == [100.0]
+
 
 class TestAggregateQueries:
     """Tests for aggregate/combined queries."""
@@ -500,6 +657,28 @@ class TestAggregateQueries:
         assert data["crystal"]["restaurants"]["count"] == 30
         assert len(data["places"]) == 1
 
+    def test_get_full_postcode_data_query_count(self, repo, session, engine):
+        """Should load the postcode and all related tables in two round-trips."""
+        repo.upsert_postcode("E1 6AN")
+        repo.upsert_demographics("E1 6AN", population=50000)
+        repo.upsert_crystal_pubs("E1 6AN", {"count": 4})
+        repo.add_place("E1 6AN", name="Test Place")
+        session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            data = repo.get_full_postcode_data("E1 6AN")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert len(statements) == 2
+        assert data["crystal"]["pubs"]["count"] == 4
+        assert data["places"][0]["name"] == "Test Place"
+
     def test_get_full_postcode_data_not_found(self, repo):
         """Should raise PostcodeNotFoundError for missing postcode."""
         with pytest.raises(PostcodeNotFoundError):
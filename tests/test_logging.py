@@ -3,16 +3,18 @@ Tests for the logging configuration module.
 """
 
 import logging
+from logging.handlers import QueueHandler
 
 import pytest
 
-from location_analyzer.logging_config import setup_logging, get_logger
+from location_analyzer.logging_config import setup_logging, get_logger, stop_logging
 
 
 @pytest.fixture(autouse=True)
 def cleanup_logger():
-    """Remove all handlers from the location_analyzer logger after each test."""
+    """Stop the listener and remove all handlers from the location_analyzer logger after each test."""
     yield
+    stop_logging()
     logger = logging.getLogger("location_analyzer")
     for handler in logger.handlers[:]:
         handler.close()
@@ -29,7 +31,8 @@ class TestSetupLogging:
         
         logger = logging.getLogger("location_analyzer")
         assert logger.level == logging.DEBUG
-        assert len(logger.handlers) >= 2  # file + console
+        # File + console output sit behind a single queue handler
+        assert [type(h) for h in logger.handlers] == [QueueHandler]
 
     def test_setup_creates_log_file_directory(self, tmp_path):
         """setup_logging should create the log file directory if missing."""
@@ -46,14 +49,26 @@ class TestSetupLogging:
         logger = logging.getLogger("location_analyzer")
         logger.info("Test message for file")
         
-        # Flush handlers
-        for handler in logger.handlers:
-            handler.flush()
+        # Drain the queue so the listener has written everything
+        stop_logging()
         
         with open(log_file) as f:
             content = f.read()
         assert "Test message for file" in content
 
+    def test_repeated_setup_does_not_stack_handlers(self, tmp_path):
+        """Calling setup_logging twice should replace, not duplicate, its handlers."""
+        setup_logging(level="INFO", log_file=str(tmp_path / "first.log"))
+        setup_logging(level="INFO", log_file=str(tmp_path / "second.log"))
+
+        logger = logging.getLogger("location_analyzer")
+        assert len(logger.handlers) == 1
+
+        logger.info("Logged once")
+        stop_logging()
+        assert (tmp_path / "second.log").read_text().count("Logged once") == 1
+        assert "Logged once" not in (tmp_path / "first.log").read_text()
+
 
 class TestGetLogger:
     """Tests for the get_logger helper."""
@@ -68,3 +83,7 @@ class TestGetLogger:
         logger1 = get_logger("module_a")
         logger2 = get_logger("module_b")
         assert logger1.name != logger2.name
+
+    def test_repeat_calls_return_same_logger(self):
+        """get_logger should hand back the same instance for the same name."""
+        assert get_logger("module_c") is get_logger("module_c")
@@ -0,0 +1,99 @@
+"""
+Tests for the live inference pipeline, with the scrapers and geocoder stubbed out.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from location_analyzer.pipeline.inference_pipeline import InferencePipeline
+
+SCRAPE_DELAY = 0.3
+
+
+@pytest.fixture
+def slow_pipeline():
+    """An InferencePipeline whose three lookups each sleep for SCRAPE_DELAY seconds."""
+    def slow(result):
+        def call(postcode):
+            time.sleep(SCRAPE_DELAY)
+            return dict(result)
+        return call
+
+    with patch("location_analyzer.pipeline.inference_pipeline.DemographicsScraper"), \
+         patch("location_analyzer.pipeline.inference_pipeline.CrystalRoofScraper"):
+        pipeline = InferencePipeline()
+    pipeline.demo_scraper.scrape_cached.side_effect = slow({"population": 50000})
+    pipeline.cr_scraper.scrape.side_effect = slow({"transport": {"score": 5}})
+    pipeline._geocode_postcode = slow({"lat": 51.5, "lng": -0.1})
+    yield pipeline
+    pipeline.close()
+
+
+class TestInferencePipelineConcurrency:
+    """Tests for fanning out the scraper calls."""
+
+    def test_lookups_run_side_by_side(self, slow_pipeline):
+        """The three lookups in one run should overlap rather than add up."""
+        start = time.perf_counter()
+        features = slow_pipeline.run("SW1A 1AA")
+        elapsed = time.perf_counter() - start
+
+        assert features["population"] == 50000
+        assert features["Transport_Accessibility_Score"] == 5
+        assert features["lat"] == 51.5
+        assert elapsed < 2 * SCRAPE_DELAY
+
+    def test_concurrent_runs_overlap(self, slow_pipeline):
+        """Two runs on the shared pipeline shouldn't queue behind each other."""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(slow_pipeline.run, ["SW1A 1AA", "E1 6AN"]))
+        elapsed = time.perf_counter() - start
+
+        assert [r["postcode"] for r in results] == ["SW1A 1AA", "E1 6AN"]
+        assert elapsed < 2 * SCRAPE_DELAY
+
+
+class TestInferencePipelineCompleteness:
+    """Tests for the completeness flag that gates response caching."""
+
+    @pytest.fixture
+    def pipeline(self):
+        with patch("location_analyzer.pipeline.inference_pipeline.DemographicsScraper"), \
+             patch("location_analyzer.pipeline.inference_pipeline.CrystalRoofScraper"):
+            pipeline = InferencePipeline()
+        pipeline.demo_scraper.scrape_cached.return_value = {"population": 50000}
+        pipeline.cr_scraper.scrape.return_value = {"postcode": "SW1A 1AA", "transport": {"score": 5}}
+        pipeline._geocode_postcode = lambda postcode: {}
+        yield pipeline
+        pipeline.close()
+
+    def test_full_scrape_is_complete(self, pipeline):
+        """Both scrapers returning data should mark the run complete."""
+        _, complete = pipeline.run_with_status("SW1A 1AA")
+        assert complete is True
+
+    def test_zero_population_is_incomplete(self, pipeline):
+        """A failed Nomis lookup returns population=0, not an empty dict."""
+        pipeline.demo_scraper.scrape_cached.return_value = {"population": 0, "households": 0}
+        _, complete = pipeline.run_with_status("SW1A 1AA")
+        assert complete is False
+
+    def test_empty_transport_section_is_incomplete(self, pipeline):
+        """A failed CrystalRoof fetch still returns all section keys, with empty values."""
+        pipeline.cr_scraper.scrape.return_value = {
+            "postcode": "SW1A 1AA", "transport": {}, "amenities": {"restaurants": [], "pubs": []},
+            "affluence": {}, "occupation": {}, "ethnicity": {},
+        }
+        _, complete = pipeline.run_with_status("SW1A 1AA")
+        assert complete is False
+
+    def test_scraper_exception_is_incomplete(self, pipeline):
+        """A scraper raising should be logged and reported as incomplete."""
+        pipeline.cr_scraper.scrape.side_effect = RuntimeError("CrystalRoof unavailable")
+        features, complete = pipeline.run_with_status("SW1A 1AA")
+        assert complete is False
+        assert features["population"] == 50000
@@ -0,0 +1,331 @@
+"""
+Tests for PredictionService feature engineering and prediction caching, and
+for the MedianEnsembleRegressor that combines the four sub-models.
+
+No trained ensemble is needed: services are built with object.__new__ and
+given small transformers fitted here plus a stub model.
+"""
+
+import threading
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import (
+    KBinsDiscretizer,
+    OrdinalEncoder,
+    PowerTransformer,
+    QuantileTransformer,
+    RobustScaler,
+)
+
+from location_analyzer.ml import predict as predict_module
+from location_analyzer.ml.predict import (
+    MedianEnsembleRegressor,
+    PredictionService,
+    _complete_rows,
+    _transform_rows,
+)
+
+EXPECTED_FEATURES = [
+    "population", "non-white_quantile", "unemployed_kmeans_bin", "ab_kmeans_bin", "de_kmeans_bin",
+    "working", "c1/c2", "avg_household_income", "Transport_Accessibility_Score", "Year", "Month",
+]
+
+
+def make_service(model=None, transformers=None) -> PredictionService:
+    """Build a PredictionService without loading artifacts from disk."""
+    service = object.__new__(PredictionService)
+    service.model = model if model is not None else MagicMock()
+    for attr in ("qt", "kbd", "pt", "rs", "oe"):
+        setattr(service, attr, (transformers or {}).get(attr))
+    service._expected_features = list(EXPECTED_FEATURES)
+    service._cat_features_known = frozenset({"Day_of_Week", "Nearest_Station_Type"})
+    service._pred_cache = OrderedDict()
+    service._pred_cache_lock = threading.Lock()
+    return service
+
+
+@pytest.fixture(scope="module")
+def fitted_transformers():
+    """Small transformers fitted on named columns, as exported from the notebook."""
+    rng = np.random.default_rng(0)
+    n = 200
+    train = pd.DataFrame({
+        "non-white": rng.uniform(0, 1, n),
+        "unemployed": rng.uniform(0, 0.2, n),
+        "ab": rng.uniform(0, 0.5, n),
+        "de": rng.uniform(0, 0.5, n),
+        "working": rng.uniform(0.3, 0.8, n),
+        "c1/c2": rng.uniform(0.1, 0.5, n),
+        "avg_household_income": rng.uniform(20000, 80000, n),
+        "Transport_Accessibility_Score": rng.integers(1, 10, n).astype(float),
+    })
+    return {
+        "qt": QuantileTransformer(n_quantiles=50).fit(train[["non-white"]]),
+        "kbd": KBinsDiscretizer(n_bins=4, encode="ordinal", strategy="kmeans")
+        .fit(train[["unemployed", "ab", "de"]]),
+        "pt": PowerTransformer().fit(train[["working", "c1/c2"]]),
+        "rs": RobustScaler().fit(train[["avg_household_income"]]),
+        "oe": OrdinalEncoder().fit(train[["Transport_Accessibility_Score"]]),
+    }
+
+
+def reference_transforms(df: pd.DataFrame, t: dict) -> pd.DataFrame:
+    """Row-by-row reference: transform each row whose block is complete, else leave it."""
+    out = df.copy()
+    new_cols = ["non-white_quantile", "unemployed_kmeans_bin", "ab_kmeans_bin", "de_kmeans_bin"]
+    for col in new_cols:
+        out[col] = np.nan
+    for i in range(len(df)):
+        row = df.iloc[[i]]
+        if row[["non-white"]].notna().all(axis=None):
+            out.iloc[i, out.columns.get_loc("non-white_quantile")] = t["qt"].transform(row[["non-white"]])[0, 0]
+        if row[["unemployed", "ab", "de"]].notna().all(axis=None):
+            bins = t["kbd"].transform(row[["unemployed", "ab", "de"]])[0]
+            for j, col in enumerate(["unemployed", "ab", "de"]):
+                out.iloc[i, out.columns.get_loc(f"{col}_kmeans_bin")] = bins[j]
+        if row[["working", "c1/c2"]].notna().all(axis=None):
+            values = t["pt"].transform(row[["working", "c1/c2"]])[0]
+            out.iloc[i, out.columns.get_loc("working")] = values[0]
+            out.iloc[i, out.columns.get_loc("c1/c2")] = values[1]
+        for name, col in (("rs", "avg_household_income"), ("oe", "Transport_Accessibility_Score")):
+            if row[[col]].notna().all(axis=None):
+                out.iloc[i, out.columns.get_loc(col)] = t[name].transform(row[[col]])[0, 0]
+    return out
+
+
+def raw_rows(n: int) -> pd.DataFrame:
+    """n raw feature rows with every transformer input present."""
+    return pd.DataFrame({
+        "population": np.linspace(20000, 90000, n),
+        "non-white": np.linspace(0.1, 0.9, n),
+        "unemployed": np.linspace(0.01, 0.15, n),
+        "ab": np.linspace(0.1, 0.4, n),
+        "de": np.linspace(0.1, 0.4, n),
+        "working": np.linspace(0.4, 0.7, n),
+        "c1/c2": np.linspace(0.2, 0.4, n),
+        "avg_household_income": np.linspace(25000, 75000, n),
+        "Transport_Accessibility_Score": np.arange(n) % 9 + 1.0,
+        "Date": "2026-03-01",
+    })
+
+
+class TestCompleteRows:
+    """Tests for the NaN row-mask helper."""
+
+    def test_dense_frame_returns_none(self):
+        """A frame with no missing values should take the unmasked fast path."""
+        assert _complete_rows(pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]})) is None
+
+    def test_sparse_frame_returns_row_mask(self):
+        """Rows missing any column should be masked out."""
+        mask = _complete_rows(pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [1.0, 2.0, None]}))
+        assert mask.tolist() == [True, False, False]
+
+    def test_empty_frame_returns_empty_mask(self):
+        """An empty frame should yield an empty mask rather than transform nothing."""
+        mask = _complete_rows(pd.DataFrame({"a": pd.Series([], dtype=float)}))
+        assert mask is not None and mask.size == 0
+
+    def test_transform_rows_keeps_masked_rows(self, fitted_transformers):
+        """Rows outside the mask should keep their original values."""
+        frame = pd.DataFrame({"avg_household_income": [30000.0, np.nan, 60000.0]})
+        mask = _complete_rows(frame)
+        out = _transform_rows(fitted_transformers["rs"], frame, mask)
+        expected = fitted_transformers["rs"].transform(frame.iloc[[0, 2]])[:, 0]
+        np.testing.assert_allclose(out[[0, 2], 0], expected)
+        assert np.isnan(out[1, 0])
+
+
+class TestTransformerMasking:
+    """Feature engineering should match a row-by-row reference on dense and sparse input."""
+
+    def check(self, raw: pd.DataFrame, transformers: dict):
+        """Assert every transformed column matches the reference."""
+        service = make_service(transformers=transformers)
+        result = service._apply_feature_engineering(raw)
+
+        expected = reference_transforms(raw, transformers)
+        for col in EXPECTED_FEATURES:
+            if col in ("population", "Year", "Month"):
+                continue
+            np.testing.assert_allclose(
+                result[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float), err_msg=col
+            )
+
+    def test_dense_input(self, fitted_transformers):
+        """Fully dense input takes the unmasked path."""
+        self.check(raw_rows(6), fitted_transformers)
+
+    def test_partially_missing_input(self, fitted_transformers):
+        """Each block should skip only the rows missing one of its inputs."""
+        raw = raw_rows(6)
+        raw.loc[0, "non-white"] = np.nan
+        raw.loc[1, "ab"] = np.nan
+        raw.loc[2, "working"] = np.nan
+        raw.loc[3, "avg_household_income"] = np.nan
+        raw.loc[4, "Transport_Accessibility_Score"] = np.nan
+        self.check(raw, fitted_transformers)
+
+    def test_single_row_input(self, fitted_transformers):
+        """A single-row API payload should transform like the batch path."""
+        self.check(raw_rows(1), fitted_transformers)
+
+    def test_single_row_with_every_block_missing(self, fitted_transformers):
+        """With no complete rows, new columns stay NaN and in-place columns are untouched."""
+        raw = raw_rows(1)
+        raw[["non-white", "de", "c1/c2", "avg_household_income", "Transport_Accessibility_Score"]] = np.nan
+        self.check(raw, fitted_transformers)
+
+
+class TestPredictionCache:
+    """Tests for the per-process prediction LRU in predict_df."""
+
+    @pytest.fixture
+    def model(self):
+        model = MagicMock()
+        # Log-space output derived from the input, so different features predict differently
+        model.predict.side_effect = lambda X: np.log1p(X["population"].to_numpy(dtype=float))
+        return model
+
+    def test_repeated_batch_skips_model(self, model):
+        """A repeated feature batch should be served without calling the model again."""
+        service = make_service(model=model)
+        first = service.predict_df(raw_rows(3))
+        second = service.predict_df(raw_rows(3))
+
+        assert second == first
+        assert model.predict.call_count == 1
+
+    def test_changed_feature_misses(self, model):
+        """Changing any engineered feature value should miss the cache."""
+        service = make_service(model=model)
+        service.predict_df(raw_rows(3))
+        changed = raw_rows(3)
+        changed.loc[0, "working"] = 0.65
+        service.predict_df(changed)
+
+        assert model.predict.call_count == 2
+
+    def test_oldest_entry_is_evicted(self, model, monkeypatch):
+        """At PREDICTION_CACHE_SIZE, the least recently used batch should be dropped."""
+        monkeypatch.setattr(PredictionService, "PREDICTION_CACHE_SIZE", 2)
+        service = make_service(model=model)
+        batches = [raw_rows(n) for n in (1, 2, 3)]
+        for batch in batches:
+            service.predict_df(batch)
+
+        assert len(service._pred_cache) == 2
+        service.predict_df(batches[2])
+        assert model.predict.call_count == 3
+        service.predict_df(batches[0])
+        assert model.predict.call_count == 4
+
+    def test_concurrent_callers_keep_cache_bounded(self, model, monkeypatch):
+        """Threads predicting at once should get correct results and never overfill the cache."""
+        monkeypatch.setattr(PredictionService, "PREDICTION_CACHE_SIZE", 4)
+        service = make_service(model=model)
+        batches = [raw_rows(n) for n in range(1, 9)]
+        expected = [service.predict_df(b) for b in batches]
+        service._pred_cache.clear()
+
+        results = [None] * len(batches)
+
+        def worker(i):
+            for _ in range(5):
+                results[i] = service.predict_df(batches[i])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(batches))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == expected
+        assert len(service._pred_cache) <= 4
+
+
+class StubRegressor:
+    """Sub-model stand-in: a fixed linear function of the population column."""
+
+    def __init__(self, scale: float, offset: float):
+        self.scale = scale
+        self.offset = offset
+        self.seen = []
+        self.threads = []
+
+    def predict(self, X):
+        self.seen.append(X)
+        self.threads.append(threading.current_thread())
+        return X["population"].to_numpy(dtype=float) * self.scale + self.offset
+
+
+class IdentityPreprocessor:
+    """RF preprocessor stand-in that passes the frame through."""
+
+    def transform(self, X):
+        return X
+
+
+class TestMedianEnsembleRegressor:
+    """Tests for the min/max median network and the parallel sub-model path."""
+
+    @pytest.fixture
+    def ensemble(self):
+        # Scales/offsets chosen so each sub-model's rank changes across rows
+        return MedianEnsembleRegressor(
+            xgb_model=StubRegressor(1.0, 0.0),
+            lgb_model=StubRegressor(-1.0, 500.0),
+            cb_model=StubRegressor(2.0, -100.0),
+            rf_model=StubRegressor(0.5, 50.0),
+            rf_preprocessor=IdentityPreprocessor(),
+            cat_features=["Nearest_Station_Type"],
+        )
+
+    @staticmethod
+    def frame(n: int) -> pd.DataFrame:
+        rng = np.random.default_rng(1)
+        return pd.DataFrame({
+            "population": rng.uniform(0, 400, n),
+            "Nearest_Station_Type": rng.choice(["Underground", "National Rail", None], n),
+        })
+
+    @staticmethod
+    def expected(ensemble, X) -> np.ndarray:
+        models = (ensemble.rf_model, ensemble.xgb_model, ensemble.lgb_model, ensemble.cb_model)
+        return np.median(np.column_stack([m.predict(X) for m in models]), axis=1)
+
+    def test_serial_matches_numpy_median(self, ensemble):
+        """Small batches run the sub-models inline and match np.median."""
+        X = self.frame(50)
+        result = ensemble.predict(X)
+        np.testing.assert_allclose(result, self.expected(ensemble, X))
+        assert ensemble.xgb_model.threads[0] is threading.current_thread()
+
+    def test_parallel_matches_numpy_median(self, ensemble, monkeypatch):
+        """Batches past PARALLEL_MIN_ROWS score in worker threads with the same result."""
+        monkeypatch.setattr(predict_module.os, "cpu_count", lambda: 4)
+        X = self.frame(MedianEnsembleRegressor.PARALLEL_MIN_ROWS)
+        result = ensemble.predict(X)
+        np.testing.assert_allclose(result, self.expected(ensemble, X))
+        assert ensemble.xgb_model.threads[0] is not threading.current_thread()
+
+    def test_single_core_stays_serial(self, ensemble, monkeypatch):
+        """Large batches on one core don't spin up threads."""
+        monkeypatch.setattr(predict_module.os, "cpu_count", lambda: 1)
+        ensemble.predict(self.frame(MedianEnsembleRegressor.PARALLEL_MIN_ROWS))
+        assert ensemble.cb_model.threads[0] is threading.current_thread()
+
+    def test_categorical_encoding_per_model(self, ensemble):
+        """XGBoost/LightGBM get pandas categories, CatBoost gets strings, missing values become 'Unknown'."""
+        X = self.frame(20)
+        ensemble.predict(X)
+        xgb_col = ensemble.xgb_model.seen[0]["Nearest_Station_Type"]
+        cb_col = ensemble.cb_model.seen[0]["Nearest_Station_Type"]
+        assert isinstance(xgb_col.dtype, pd.CategoricalDtype)
+        assert "Unknown" in set(cb_col)
+        assert not isinstance(cb_col.dtype, pd.CategoricalDtype)
+        assert X["Nearest_Station_Type"].isna().any()
@@ -0,0 +1,98 @@
+"""
+Tests for the in-process /predict response cache.
+"""
+
+import asyncio
+
+import pytest
+
+from location_analyzer.api import cache as cache_module
+from location_analyzer.api.cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestResponseCacheEntries:
+    """Tests for get/set, expiry and eviction."""
+
+    def test_set_and_get(self):
+        """Should return a stored value."""
+        cache = ResponseCache()
+        cache.set(("SW1A 1AA", None), {"sales": 1})
+        assert cache.get(("SW1A 1AA", None)) == {"sales": 1}
+
+    def test_get_missing(self):
+        """Should return None for an unknown key."""
+        assert ResponseCache().get("nope") is None
+
+    def test_entry_expires_after_ttl(self, clock):
+        """Entries should be dropped once their TTL has passed."""
+        cache = ResponseCache(ttl_seconds=60)
+        cache.set("k", "v")
+
+        clock[0] += 59
+        assert cache.get("k") == "v"
+        clock[0] += 1
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """At maxsize, the least recently used entry should be evicted first."""
+        cache = ResponseCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_clear(self):
+        """Should drop every entry."""
+        cache = ResponseCache()
+        cache.set("a", 1)
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestResponseCacheLocking:
+    """Tests for per-key request coalescing."""
+
+    def test_concurrent_callers_share_one_lock(self):
+        """Two callers on one key should get the same lock, so only one does the work."""
+        cache = ResponseCache()
+        calls = []
+        locks = []
+
+        async def handle(key):
+            lock = cache.lock_for(key)
+            locks.append(lock)
+            async with lock:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+                calls.append(key)
+                await asyncio.sleep(0.01)
+                cache.set(key, "forecast")
+                return "forecast"
+
+        async def main():
+            return await asyncio.gather(handle("SW1A 1AA"), handle("SW1A 1AA"))
+
+        assert asyncio.run(main()) == ["forecast", "forecast"]
+        assert locks[0] is locks[1]
+        assert calls == ["SW1A 1AA"]
+
+    def test_different_keys_get_different_locks(self):
+        """Unrelated keys shouldn't serialize on each other."""
+        cache = ResponseCache()
+        lock_a = cache.lock_for("a")
+        assert cache.lock_for("b") is not lock_a